@@ -6,6 +6,11 @@ import asyncio
 import os
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # Optional: fall back to the default asyncio event loop
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
@@ -71,6 +76,9 @@ async def review_pr_example():
 
 
 if __name__ == "__main__":
+    # uvloop (installed with uvicorn[standard]) speeds up the GitHub API round trips
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(review_pr_example())
 
 
@@ -1,5 +1,6 @@
 """Setup script for the code review system"""
 
+import os
 from setuptools import setup, find_packages
 
 with open("README.md", "r", encoding="utf-8") as fh:
@@ -8,6 +9,16 @@ with open("README.md", "r", encoding="utf-8") as fh:
 with open("requirements.txt", "r", encoding="utf-8") as fh:
     requirements = [line.strip() for line in fh if line.strip() and not line.startswith("#")]
 
+# Optionally compile the CPU-bound analyzers to C extensions with mypyc
+# (DEEP_DIVE_MYPYC=1 pip install .); the pure-Python modules are used otherwise
+ext_modules = []
+if os.environ.get("DEEP_DIVE_MYPYC"):
+    from mypyc.build import mypycify
+    ext_modules = mypycify([
+        "src/analyzers/architecture_checker.py",
+        "src/analyzers/_diff_scan.py",
+    ])
+
 setup(
     name="deep-dive-code-review",
     version="0.1.0",
@@ -28,6 +39,7 @@ setup(
     ],
     python_requires=">=3.10",
     install_requires=requirements,
+    ext_modules=ext_modules,
     entry_points={
         "console_scripts": [
             "deep-dive=src.main:app",
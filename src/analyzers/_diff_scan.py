@@ -0,0 +1,142 @@
+"""
+Diff parsing and per-line regex matching used by PatternMatcher.
+
+Kept free of analyzer state so it can be compiled with mypyc
+(DEEP_DIVE_MYPYC=1 pip install .); the pure-Python module is used otherwise.
+"""
+
+import re
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+
+def index_added_lines(diff_content: str, max_line_length: int = 4096) -> Tuple[str, List[int], List[int]]:
+    """
+    Join the added lines of a diff into one buffer.
+    
+    Returns the buffer, the offset at which each added line starts in it
+    and each added line's line number in the new file. Added lines longer
+    than max_line_length (minified or generated code) are left out so a
+    single huge line can't dominate the scan time of every pattern.
+    """
+    added: List[str] = []
+    line_numbers: List[int] = []
+    current_line = 0
+    
+    for line in diff_content.split('\n'):
+        # Branch on the first character once instead of several startswith calls
+        first = line[:1]
+        
+        # Track line numbers (lines starting with + are additions)
+        if first == '+':
+            if line[:3] == '+++':  # Skip diff headers
+                continue
+            current_line += 1
+            if len(line) > max_line_length + 1:
+                continue
+            added.append(line[1:])  # Remove + prefix
+            line_numbers.append(current_line)
+        elif first == '-':
+            continue
+        elif first == '@' and line[:2] == '@@':
+            continue
+        elif first == 'd' and line[:4] == 'diff':
+            continue
+        else:
+            current_line += 1
+    
+    line_starts: List[int] = []
+    offset = 0
+    for line_content in added:
+        line_starts.append(offset)
+        offset += len(line_content) + 1
+    
+    return "\n".join(added), line_starts, line_numbers
+
+
+def find_pattern_matches(
+    added_lines: Tuple[str, List[int], List[int]], 
+    regex: "re.Pattern[str]"
+) -> List[Tuple[int, str]]:
+    """
+    Find all matches of a compiled pattern in the added lines of a diff.
+    
+    Returns a (line number, snippet) pair per match.
+    """
+    matches: List[Tuple[int, str]] = []
+    buffer, line_starts, line_numbers = added_lines
+    if not line_starts:
+        return matches
+    
+    # Added-line index of each entry in matches
+    match_lines: List[int] = []
+    
+    # One regex pass over the whole buffer instead of one call per line
+    pos = 0
+    while pos <= len(buffer):
+        rescan_from: Optional[int] = None
+        for match in regex.finditer(buffer, pos):
+            index = bisect_right(line_starts, match.start()) - 1
+            if "\n" not in match.group(0):
+                matches.append(_make_match(
+                    buffer, line_starts, line_numbers, index, match.start(), match.end()
+                ))
+                match_lines.append(index)
+                continue
+            
+            # Patterns are matched per line, so a match spanning lines is
+            # not a real one; redo the lines it covers individually and
+            # resume the buffer scan after them
+            while match_lines and match_lines[-1] >= index:
+                match_lines.pop()
+                matches.pop()
+            last = bisect_right(line_starts, match.end() - 1) - 1
+            for line_index in range(index, last + 1):
+                line_matches = _match_line(buffer, line_starts, line_numbers, line_index, regex)
+                matches.extend(line_matches)
+                match_lines.extend([line_index] * len(line_matches))
+            rescan_from = line_starts[last + 1] if last + 1 < len(line_starts) else len(buffer) + 1
+            break
+        
+        if rescan_from is None:
+            break
+        pos = rescan_from
+    
+    return matches
+
+
+def _match_line(
+    buffer: str,
+    line_starts: List[int],
+    line_numbers: List[int],
+    index: int,
+    regex: "re.Pattern[str]"
+) -> List[Tuple[int, str]]:
+    """Find all matches of a compiled pattern within a single added line"""
+    start = line_starts[index]
+    end = line_starts[index + 1] - 1 if index + 1 < len(line_starts) else len(buffer)
+    return [
+        _make_match(buffer, line_starts, line_numbers, index, start + m.start(), start + m.end())
+        for m in regex.finditer(buffer[start:end])
+    ]
+
+
+def _make_match(
+    buffer: str,
+    line_starts: List[int],
+    line_numbers: List[int],
+    index: int,
+    match_start: int,
+    match_end: int
+) -> Tuple[int, str]:
+    """Return the line number and snippet of a match at buffer offsets within added line `index`"""
+    line_start = line_starts[index]
+    line_end = line_starts[index + 1] - 1 if index + 1 < len(line_starts) else len(buffer)
+    line_content = buffer[line_start:line_end]
+    
+    return (
+        line_numbers[index],
+        line_content[max(0, match_start - line_start - 20):match_end - line_start + 20]
+    )
+
+
@@ -1,10 +1,97 @@
 """Architecture and design pattern checker"""
 
-from typing import List
-from ..models.review import CodeReviewRequest
+import hashlib
+import re
+from dataclasses import dataclass
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from ..models.review import CodeReviewRequest, FileDiff
 from ..models.analysis import AnalysisResult, AnalysisCategory, PriorityLevel
 from .base import BaseAnalyzer
 
+try:
+    import ahocorasick  # type: ignore[import-not-found]
+except ImportError:  # Optional: fall back to per-group regex scans
+    ahocorasick = None  # type: ignore[assignment]
+
+try:
+    import hyperscan
+except ImportError:  # Optional: only used to speed up very large diffs
+    hyperscan = None  # type: ignore[assignment]
+
+
+# Added import lines: "+from pkg.mod import x" or "+import pkg.mod"
+_IMPORT_RE = re.compile(r'^\+\s*(?:from\s+([\w.]+)\s+import\b|import\s+([\w.]+))', re.MULTILINE)
+
+# Function/method definition keywords, counted in one scan of the diff
+_DEFINITION_RE = re.compile(r'\b(def|func|function) ', re.IGNORECASE)
+
+
+# Imports per diff, keyed by a digest of the diff so the cache doesn't keep
+# the diff texts themselves alive; least recently used entries are dropped
+_IMPORTS_CACHE: "OrderedDict[bytes, Tuple[str, ...]]" = OrderedDict()
+_IMPORTS_CACHE_SIZE = 1024
+
+
+def _extract_imports(diff_content: str) -> Tuple[str, ...]:
+    """
+    Extract imported modules from diff.
+    
+    Cached on a hash of the diff text so re-reviews of an unchanged file
+    (e.g. a force-push re-triggering the webhook) skip the parse.
+    """
+    key = hashlib.blake2b(diff_content.encode(), digest_size=16).digest()
+    imports = _IMPORTS_CACHE.get(key)
+    if imports is not None:
+        _IMPORTS_CACHE.move_to_end(key)
+        return imports
+    
+    imports = tuple(m.group(1) or m.group(2) for m in _IMPORT_RE.finditer(diff_content))
+    _IMPORTS_CACHE[key] = imports
+    if len(_IMPORTS_CACHE) > _IMPORTS_CACHE_SIZE:
+        _IMPORTS_CACHE.popitem(last=False)
+    return imports
+
+
+def _module_names(file_path: str) -> Tuple[str, ...]:
+    """
+    Dotted module names a Python file can be imported as.
+    
+    "pkg/alpha.py" is "pkg.alpha" and "pkg/__init__.py" is "pkg"; under a
+    src/ layout the name without the "src." prefix is included too.
+    """
+    if not file_path.endswith(".py"):
+        return ()
+    
+    parts = file_path[:-len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts.pop()
+    if not parts:
+        return ()
+    
+    names = [".".join(parts)]
+    if parts[0] == "src" and len(parts) > 1:
+        names.append(".".join(parts[1:]))
+    return tuple(names)
+
+
+@dataclass(frozen=True, slots=True)
+class FileFeatures:
+    """Everything the per-file checks need, extracted from one scan of the diff"""
+    has_db: bool
+    has_api: bool
+    has_biz: bool
+    has_controller_violation: bool
+    has_model_violation: bool
+    has_interface: bool
+    has_singleton: bool
+    has_direct_instantiation: bool
+    has_constructor_injection: bool
+    method_count: int
+    function_count: int
+    is_controller_path: bool
+    is_model_path: bool
+
 
 class ArchitectureChecker(BaseAnalyzer):
     """
@@ -12,273 +99,376 @@ class ArchitectureChecker(BaseAnalyzer):
     Analyzes coupling, cohesion, and design pattern adherence.
     """
     
+    # Keyword groups searched for (case-insensitively) in the diff of each file
+    DIFF_KEYWORDS = {
+        "database": ["select", "insert", "update", "delete", "from"],
+        "api": ["@app.route", "def get_", "def post_", "request"],
+        "business_logic": ["def calculate", "def process", "def validate"],
+        "controller_violation": ["sql", "query(", "orm.", "repository"],
+        "model_violation": ["@app.route", "def process", "def calculate"],
+        "interface": ["interface", "protocol", "trait"],
+        "singleton": ["singleton"],
+        "getinstance": ["getinstance"],
+    }
+    
+    # Keywords identifying the architectural layer from the file path
+    LAYER_KEYWORDS = {
+        "database": ["sql", "query", "orm", "repository", "dao"],
+        "service": ["service", "business", "logic", "handler"],
+        "controller": ["controller", "route", "endpoint", "api"],
+        "model": ["model", "entity", "dto", "schema"]
+    }
+    
+    # Below this many changes the text heuristics are noise, so skip the scans
+    MIN_SCAN_CHANGES = 10
+    
+    # Above this many changes only the head and tail of the diff are scanned
+    SAMPLED_SCAN_CHANGES = 5000
+    SAMPLE_SIZE = 64 * 1024
+    
+    # Texts at least this long are matched with hyperscan when it is installed
+    HYPERSCAN_MIN_SIZE = 1024 * 1024
+    
     def __init__(self):
         super().__init__("ArchitectureChecker")
+        self._diff_automaton = self._build_automaton(self.DIFF_KEYWORDS)
+        self._layer_automaton = self._build_automaton(self.LAYER_KEYWORDS)
+        self._diff_patterns = self._build_patterns(self.DIFF_KEYWORDS)
+        self._layer_patterns = self._build_patterns(self.LAYER_KEYWORDS)
+        self._diff_hyperscan = self._build_hyperscan_db(self.DIFF_KEYWORDS)
+        self._diff_group_names = tuple(self.DIFF_KEYWORDS)
+        
+        # Language-specific checks, dispatched on file_diff.language
+        self._language_checks = {
+            "python": (self._check_dependency_injection, self._check_interface_segregation),
+            "java": (self._check_dependency_injection, self._check_interface_segregation),
+            "csharp": (self._check_dependency_injection, self._check_interface_segregation),
+            "go": (self._check_interface_segregation,),
+        }
     
     async def analyze(self, request: CodeReviewRequest) -> List[AnalysisResult]:
         """Analyze code for architectural issues"""
-        results = []
+        min_confidence = 0.5
         
-        # Check for circular dependencies
-        results.extend(await self._check_circular_dependencies(request))
+        # Run every per-file check in a single pass over the files, filtering
+        # by confidence as results are produced
+        results = [
+            result
+            for file_diff in request.diff
+            for result in self._analyze_file(file_diff)
+            if result.confidence >= min_confidence
+        ]
         
-        # Check for violation of separation of concerns
-        results.extend(await self._check_separation_of_concerns(request))
+        # Circular dependencies need the imports of all files, so run them afterwards
+        results.extend(
+            result for result in self._check_circular_dependencies(request)
+            if result.confidence >= min_confidence
+        )
+        
+        return results
+    
+    def _analyze_file(self, file_diff: FileDiff) -> Iterator[AnalysisResult]:
+        """Run all per-file checks against features extracted once from the diff"""
+        # Check for large files/functions (complexity) - needs only the change count
+        yield from self._check_complexity(file_diff)
         
-        # Check for large files/functions (complexity)
-        results.extend(await self._check_complexity(request))
+        if file_diff.changes < self.MIN_SCAN_CHANGES:
+            return
+        
+        features = self._extract_features(file_diff)
+        
+        # Check for violation of separation of concerns
+        yield from self._check_separation_of_concerns(file_diff, features)
         
         # Advanced architecture checks
-        results.extend(await self._check_dependency_injection(request))
-        results.extend(await self._check_interface_segregation(request))
-        results.extend(await self._check_layer_violations(request))
-        results.extend(await self._check_design_patterns(request))
+        for check in self._language_checks.get(file_diff.language, ()):
+            yield from check(file_diff, features)
+        yield from self._check_layer_violations(file_diff, features)
+        yield from self._check_design_patterns(file_diff, features)
+    
+    def _extract_features(self, file_diff: FileDiff) -> FileFeatures:
+        """Scan the diff and file path once and collect the features the checks test"""
+        text = self._scan_text(file_diff)
+        if self._diff_hyperscan is not None and len(text) >= self.HYPERSCAN_MIN_SIZE:
+            matched = self._scan_hyperscan(text, self._diff_hyperscan, self._diff_group_names)
+        else:
+            # The full diff's lowercased copy is shared with the other analyzers
+            text_lower = self._diff_lower(file_diff) if text is file_diff.diff else None
+            matched = self._match_groups(text, self._diff_patterns, self._diff_automaton, text_lower)
+        definitions = Counter(keyword.lower() for keyword in _DEFINITION_RE.findall(text))
+        layers = self._match_groups(file_diff.file_path, self._layer_patterns, self._layer_automaton)
         
-        return self._filter_by_confidence(results, min_confidence=0.5)
+        return FileFeatures(
+            has_db="database" in matched,
+            has_api="api" in matched,
+            has_biz="business_logic" in matched,
+            has_controller_violation="controller_violation" in matched,
+            has_model_violation="model_violation" in matched,
+            has_interface="interface" in matched,
+            has_singleton="singleton" in matched and "getinstance" in matched,
+            has_direct_instantiation=any(pattern in text for pattern in ["new ", "= Class("]),
+            has_constructor_injection="__init__" in text,
+            method_count=definitions["def"] + definitions["func"],
+            function_count=definitions["def"] + definitions["func"] + definitions["function"],
+            is_controller_path="controller" in layers,
+            is_model_path="model" in layers
+        )
     
-    async def _check_circular_dependencies(self, request: CodeReviewRequest) -> List[AnalysisResult]:
-        """Check for potential circular dependencies"""
-        results = []
+    def _scan_text(self, file_diff: FileDiff) -> str:
+        """Return the part of the diff the keyword scans run over"""
+        diff = file_diff.diff
+        if file_diff.changes <= self.SAMPLED_SCAN_CHANGES or len(diff) <= 2 * self.SAMPLE_SIZE:
+            return diff
         
+        # Bound the work on huge (generated/vendored) diffs; the newline keeps
+        # keywords from matching across the two slices
+        return diff[:self.SAMPLE_SIZE] + "\n" + diff[-self.SAMPLE_SIZE:]
+    
+    def _check_circular_dependencies(self, request: CodeReviewRequest) -> Iterator[AnalysisResult]:
+        """Check for potential circular dependencies"""
         # Simple heuristic: if file A imports B and B imports A
-        imports_map = {}
+        files = self._scannable_files(request)
         
-        for file_diff in request.diff:
-            if file_diff.status == "removed":
-                continue
-            
-            imports = self._extract_imports(file_diff.diff, file_diff.file_path)
-            imports_map[file_diff.file_path] = imports
+        # Imports name modules, so map module names back to the changed files
+        module_paths = {
+            module: file_diff.file_path
+            for file_diff in files
+            for module in _module_names(file_diff.file_path)
+        }
+        imports_map: Dict[str, Set[str]] = {
+            file_diff.file_path: {
+                module_paths[module]
+                for module in _extract_imports(file_diff.diff)
+                if module in module_paths
+            }
+            for file_diff in files
+        }
         
-        # Check for circular imports
+        # Check for circular imports, reporting each pair once
         for file_path, imports in imports_map.items():
-            for imported_file in imports:
-                if imported_file in imports_map:
-                    if file_path in imports_map[imported_file]:
-                        results.append(AnalysisResult(
-                            category=AnalysisCategory.ARCHITECTURE,
-                            priority=PriorityLevel.MEDIUM,
-                            confidence=0.6,
-                            location=self._get_file_location(file_path),
-                            title="Potential circular dependency",
-                            description=f"Circular import detected between {file_path} and {imported_file}",
-                            suggestion="Refactor to break circular dependency. Consider dependency injection or extracting shared code",
-                            metadata={"circular_with": imported_file}
-                        ))
-        
-        return results
+            for imported_file in sorted(imports):
+                if file_path < imported_file and file_path in imports_map[imported_file]:
+                    yield AnalysisResult(
+                        category=AnalysisCategory.ARCHITECTURE,
+                        priority=PriorityLevel.MEDIUM,
+                        confidence=0.6,
+                        location=self._get_file_location(file_path),
+                        title="Potential circular dependency",
+                        description=f"Circular import detected between {file_path} and {imported_file}",
+                        suggestion="Refactor to break circular dependency. Consider dependency injection or extracting shared code",
+                        metadata={"circular_with": imported_file}
+                    )
     
-    async def _check_separation_of_concerns(self, request: CodeReviewRequest) -> List[AnalysisResult]:
+    def _check_separation_of_concerns(self, file_diff: FileDiff, features: FileFeatures) -> Iterator[AnalysisResult]:
         """Check for violations of separation of concerns"""
-        results = []
+        # Check if file mixes concerns (e.g., database + business logic + API).
+        # All three must be present, so stop at the first one that is missing
+        if not (features.has_db and features.has_api and features.has_biz):
+            return
         
-        for file_diff in request.diff:
-            # Check if file mixes concerns (e.g., database + business logic + API)
-            concerns_found = []
-            
-            if any(keyword in file_diff.diff.lower() for keyword in ["select", "insert", "update", "delete", "from"]):
-                concerns_found.append("database")
-            
-            if any(keyword in file_diff.diff.lower() for keyword in ["@app.route", "def get_", "def post_", "request"]):
-                concerns_found.append("api")
-            
-            if any(keyword in file_diff.diff.lower() for keyword in ["def calculate", "def process", "def validate"]):
-                concerns_found.append("business_logic")
-            
-            if len(concerns_found) >= 3:
-                results.append(AnalysisResult(
-                    category=AnalysisCategory.ARCHITECTURE,
-                    priority=PriorityLevel.MEDIUM,
-                    confidence=0.55,
-                    location=self._get_file_location(file_diff.file_path),
-                    title="Potential violation of separation of concerns",
-                    description=f"File appears to mix multiple concerns: {', '.join(concerns_found)}",
-                    suggestion="Consider splitting into separate modules following single responsibility principle",
-                    metadata={"concerns": concerns_found}
-                ))
+        concerns_found = ["database", "api", "business_logic"]
         
-        return results
+        yield AnalysisResult(
+            category=AnalysisCategory.ARCHITECTURE,
+            priority=PriorityLevel.MEDIUM,
+            confidence=0.55,
+            location=self._get_file_location(file_diff.file_path),
+            title="Potential violation of separation of concerns",
+            description=f"File appears to mix multiple concerns: {', '.join(concerns_found)}",
+            suggestion="Consider splitting into separate modules following single responsibility principle",
+            metadata={"concerns": concerns_found}
+        )
     
-    async def _check_complexity(self, request: CodeReviewRequest) -> List[AnalysisResult]:
+    def _check_complexity(self, file_diff: FileDiff) -> Iterator[AnalysisResult]:
         """Check for overly complex code"""
-        results = []
-        
-        for file_diff in request.diff:
-            # Simple heuristic: very large diffs might indicate complexity
-            if file_diff.changes > 500:
-                results.append(AnalysisResult(
-                    category=AnalysisCategory.ARCHITECTURE,
-                    priority=PriorityLevel.LOW,
-                    confidence=0.5,
-                    location=self._get_file_location(file_diff.file_path),
-                    title="Large change set detected",
-                    description=f"File has {file_diff.changes} changes, which may indicate high complexity",
-                    suggestion="Consider breaking this into smaller, focused PRs for easier review",
-                    metadata={"change_count": file_diff.changes}
-                ))
+        # Simple heuristic: very large diffs might indicate complexity
+        if file_diff.changes <= 500:
+            return
         
-        return results
+        yield AnalysisResult(
+            category=AnalysisCategory.ARCHITECTURE,
+            priority=PriorityLevel.LOW,
+            confidence=0.5,
+            location=self._get_file_location(file_diff.file_path),
+            title="Large change set detected",
+            description=f"File has {file_diff.changes} changes, which may indicate high complexity",
+            suggestion="Consider breaking this into smaller, focused PRs for easier review",
+            metadata={"change_count": file_diff.changes}
+        )
     
-    def _extract_imports(self, diff_content: str, file_path: str) -> List[str]:
-        """Extract imported modules from diff"""
-        imports = []
-        lines = diff_content.split('\n')
+    def _build_automaton(self, keyword_groups: Dict[str, List[str]]) -> Optional[Any]:
+        """Compile keyword groups into an Aho-Corasick automaton (None if unavailable)"""
+        if ahocorasick is None:
+            return None
         
-        for line in lines:
-            if line.startswith('+') and ('import' in line or 'from' in line):
-                # Simple extraction - in production, use AST parser
-                if 'from' in line:
-                    parts = line.split('import')
-                    if len(parts) > 1:
-                        module = parts[0].replace('+', '').replace('from', '').strip()
-                        imports.append(module)
-                elif 'import' in line:
-                    parts = line.split('import')
-                    if len(parts) > 1:
-                        module = parts[1].split(',')[0].strip()
-                        imports.append(module)
+        # A keyword may belong to several groups, so tag it with all of them
+        tagged: Dict[str, List[str]] = {}
+        for group, keywords in keyword_groups.items():
+            for keyword in keywords:
+                tagged.setdefault(keyword, []).append(group)
         
-        return imports
+        automaton = ahocorasick.Automaton()
+        for keyword, groups in tagged.items():
+            automaton.add_word(keyword, (tuple(groups), keyword))
+        automaton.make_automaton()
+        return automaton
     
-    def _get_file_location(self, file_path: str):
-        """Create a basic file-level location"""
-        from ..models.review import CodeLocation
-        return CodeLocation(
-            file_path=file_path,
-            line_start=1,
-            line_end=1
+    def _build_patterns(self, keyword_groups: Dict[str, List[str]]) -> Dict[str, re.Pattern]:
+        """Compile each keyword group into a single case-insensitive regex"""
+        return {
+            group: re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+            for group, keywords in keyword_groups.items()
+        }
+    
+    def _build_hyperscan_db(self, keyword_groups: Dict[str, List[str]]) -> Optional[Any]:
+        """Compile keyword groups into a hyperscan database (None if unavailable)"""
+        if hyperscan is None:
+            return None
+        
+        # One caseless expression per group; the expression id is the group's index
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+        expressions = [
+            "|".join(re.escape(keyword) for keyword in keywords).encode()
+            for keywords in keyword_groups.values()
+        ]
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[flags] * len(expressions)
         )
+        return database
     
-    async def _check_dependency_injection(self, request: CodeReviewRequest) -> List[AnalysisResult]:
-        """Check for proper dependency injection patterns"""
-        results = []
+    def _scan_hyperscan(self, text: str, database: Any, group_names: Tuple[str, ...]) -> Set[str]:
+        """Return the names of the keyword groups that occur in text using hyperscan"""
+        matched = set()
         
-        for file_diff in request.diff:
-            # Look for direct instantiation of dependencies (potential violation)
-            if file_diff.language in ["python", "java", "csharp"]:
-                # Check for new/Class() patterns without DI
-                if any(pattern in file_diff.diff for pattern in ["new ", "= Class(", "= Class()"]):
-                    # But allow if constructor injection is used
-                    if "def __init__" not in file_diff.diff and "__init__" not in file_diff.diff:
-                        results.append(AnalysisResult(
-                            category=AnalysisCategory.ARCHITECTURE,
-                            priority=PriorityLevel.MEDIUM,
-                            confidence=0.6,
-                            location=self._get_file_location(file_diff.file_path),
-                            title="Potential dependency injection violation",
-                            description="Direct instantiation detected - consider using dependency injection",
-                            suggestion="Use dependency injection framework or constructor injection for better testability",
-                            metadata={"issue_type": "dependency_injection"}
-                        ))
+        def on_match(group_id: int, start: int, end: int, flags: int, context: Any) -> bool:
+            matched.add(group_names[group_id])
+            # Stop scanning once every group has been seen
+            return len(matched) == len(group_names)
         
-        return results
+        try:
+            database.scan(text.encode("utf-8", "replace"), match_event_handler=on_match)
+        except hyperscan.ScanTerminated:
+            pass  # Raised when on_match stopped the scan early
+        return matched
     
-    async def _check_interface_segregation(self, request: CodeReviewRequest) -> List[AnalysisResult]:
-        """Check for interface segregation principle violations"""
-        results = []
+    def _match_groups(
+        self,
+        text: str,
+        patterns: Dict[str, re.Pattern],
+        automaton: Optional[Any] = None,
+        text_lower: Optional[str] = None
+    ) -> Set[str]:
+        """
+        Return the names of the keyword groups that occur in text (case-insensitive).
         
-        for file_diff in request.diff:
-            # Look for interfaces/protocols with many methods
-            if file_diff.language in ["python", "java", "csharp", "go"]:
-                # Count method definitions in interface/protocol
-                method_count = file_diff.diff.lower().count("def ") + file_diff.diff.lower().count("func ")
-                if method_count > 10 and any(keyword in file_diff.diff.lower() for keyword in ["interface", "protocol", "trait"]):
-                    results.append(AnalysisResult(
-                        category=AnalysisCategory.ARCHITECTURE,
-                        priority=PriorityLevel.LOW,
-                        confidence=0.55,
-                        location=self._get_file_location(file_diff.file_path),
-                        title="Large interface detected",
-                        description=f"Interface has {method_count} methods - may violate interface segregation principle",
-                        suggestion="Consider splitting into smaller, focused interfaces",
-                        metadata={"method_count": method_count, "issue_type": "interface_segregation"}
-                    ))
+        text_lower, when given, is a lowercased copy of text to reuse.
+        """
+        if automaton is None:
+            # IGNORECASE matching avoids allocating a lowercased copy of text
+            return {group for group, pattern in patterns.items() if pattern.search(text)}
         
-        return results
+        # The automaton is case-sensitive, so it needs one lowercased copy
+        if text_lower is None:
+            text_lower = text.lower()
+        matched = set()
+        for _, (groups, _) in automaton.iter(text_lower):
+            matched.update(groups)
+        return matched
+    
+    def _check_dependency_injection(self, file_diff: FileDiff, features: FileFeatures) -> Iterator[AnalysisResult]:
+        """Check for proper dependency injection patterns"""
+        # Look for direct instantiation of dependencies (potential violation):
+        # new/Class() patterns without DI, but allow constructor injection
+        if not features.has_direct_instantiation or features.has_constructor_injection:
+            return
+        
+        yield AnalysisResult(
+            category=AnalysisCategory.ARCHITECTURE,
+            priority=PriorityLevel.MEDIUM,
+            confidence=0.6,
+            location=self._get_file_location(file_diff.file_path),
+            title="Potential dependency injection violation",
+            description="Direct instantiation detected - consider using dependency injection",
+            suggestion="Use dependency injection framework or constructor injection for better testability",
+            metadata={"issue_type": "dependency_injection"}
+        )
     
-    async def _check_layer_violations(self, request: CodeReviewRequest) -> List[AnalysisResult]:
+    def _check_interface_segregation(self, file_diff: FileDiff, features: FileFeatures) -> Iterator[AnalysisResult]:
+        """Check for interface segregation principle violations"""
+        # Look for interfaces/protocols with many methods
+        method_count = features.method_count
+        if method_count <= 10 or not features.has_interface:
+            return
+        
+        yield AnalysisResult(
+            category=AnalysisCategory.ARCHITECTURE,
+            priority=PriorityLevel.LOW,
+            confidence=0.55,
+            location=self._get_file_location(file_diff.file_path),
+            title="Large interface detected",
+            description=f"Interface has {method_count} methods - may violate interface segregation principle",
+            suggestion="Consider splitting into smaller, focused interfaces",
+            metadata={"method_count": method_count, "issue_type": "interface_segregation"}
+        )
+    
+    def _check_layer_violations(self, file_diff: FileDiff, features: FileFeatures) -> Iterator[AnalysisResult]:
         """Check for architectural layer violations"""
-        results = []
+        # Check for cross-layer violations
+        violations = []
         
-        layer_keywords = {
-            "database": ["sql", "query", "orm", "repository", "dao"],
-            "service": ["service", "business", "logic", "handler"],
-            "controller": ["controller", "route", "endpoint", "api"],
-            "model": ["model", "entity", "dto", "schema"]
-        }
+        # Controller shouldn't have database code
+        if features.is_controller_path and features.has_controller_violation:
+            violations.append("database access in controller")
         
-        for file_diff in request.diff:
-            file_path_lower = file_diff.file_path.lower()
-            detected_layers = []
-            
-            # Detect layer from file path
-            for layer, keywords in layer_keywords.items():
-                if any(keyword in file_path_lower for keyword in keywords):
-                    detected_layers.append(layer)
-            
-            # Check for cross-layer violations
-            diff_lower = file_diff.diff.lower()
-            violations = []
-            
-            if "controller" in detected_layers or "api" in file_path_lower:
-                # Controller shouldn't have database code
-                if any(kw in diff_lower for kw in ["sql", "query(", "orm.", "repository"]):
-                    violations.append("database access in controller")
-            
-            if "model" in detected_layers or "entity" in file_path_lower:
-                # Model shouldn't have business logic
-                if any(kw in diff_lower for kw in ["@app.route", "def process", "def calculate"]):
-                    violations.append("business logic in model")
-            
-            if violations:
-                results.append(AnalysisResult(
-                    category=AnalysisCategory.ARCHITECTURE,
-                    priority=PriorityLevel.MEDIUM,
-                    confidence=0.65,
-                    location=self._get_file_location(file_diff.file_path),
-                    title="Architectural layer violation",
-                    description=f"Detected violations: {', '.join(violations)}",
-                    suggestion="Refactor to maintain proper layer separation (Controller -> Service -> Repository -> Model)",
-                    metadata={"violations": violations, "issue_type": "layer_violation"}
-                ))
+        # Model shouldn't have business logic
+        if features.is_model_path and features.has_model_violation:
+            violations.append("business logic in model")
         
-        return results
+        if not violations:
+            return
+        
+        yield AnalysisResult(
+            category=AnalysisCategory.ARCHITECTURE,
+            priority=PriorityLevel.MEDIUM,
+            confidence=0.65,
+            location=self._get_file_location(file_diff.file_path),
+            title="Architectural layer violation",
+            description=f"Detected violations: {', '.join(violations)}",
+            suggestion="Refactor to maintain proper layer separation (Controller -> Service -> Repository -> Model)",
+            metadata={"violations": violations, "issue_type": "layer_violation"}
+        )
     
-    async def _check_design_patterns(self, request: CodeReviewRequest) -> List[AnalysisResult]:
+    def _check_design_patterns(self, file_diff: FileDiff, features: FileFeatures) -> Iterator[AnalysisResult]:
         """Check for design pattern violations or opportunities"""
-        results = []
-        
-        for file_diff in request.diff:
-            diff_lower = file_diff.diff.lower()
-            
-            # Check for singleton anti-pattern
-            if "singleton" in diff_lower and "getinstance" in diff_lower:
-                results.append(AnalysisResult(
-                    category=AnalysisCategory.ARCHITECTURE,
-                    priority=PriorityLevel.LOW,
-                    confidence=0.5,
-                    location=self._get_file_location(file_diff.file_path),
-                    title="Singleton pattern detected",
-                    description="Singleton pattern can make testing difficult and create hidden dependencies",
-                    suggestion="Consider using dependency injection instead of singleton",
-                    metadata={"pattern": "singleton", "issue_type": "design_pattern"}
-                ))
-            
-            # Check for god object (too many responsibilities)
-            function_count = diff_lower.count("def ") + diff_lower.count("func ") + diff_lower.count("function ")
-            if function_count > 20:
-                results.append(AnalysisResult(
-                    category=AnalysisCategory.ARCHITECTURE,
-                    priority=PriorityLevel.MEDIUM,
-                    confidence=0.6,
-                    location=self._get_file_location(file_diff.file_path),
-                    title="Potential god object",
-                    description=f"File has {function_count} functions - may have too many responsibilities",
-                    suggestion="Consider splitting into smaller, focused classes/modules",
-                    metadata={"function_count": function_count, "issue_type": "god_object"}
-                ))
+        # Check for singleton anti-pattern
+        if features.has_singleton:
+            yield AnalysisResult(
+                category=AnalysisCategory.ARCHITECTURE,
+                priority=PriorityLevel.LOW,
+                confidence=0.5,
+                location=self._get_file_location(file_diff.file_path),
+                title="Singleton pattern detected",
+                description="Singleton pattern can make testing difficult and create hidden dependencies",
+                suggestion="Consider using dependency injection instead of singleton",
+                metadata={"pattern": "singleton", "issue_type": "design_pattern"}
+            )
         
-        return results
-
+        # Check for god object (too many responsibilities)
+        function_count = features.function_count
+        if function_count > 20:
+            yield AnalysisResult(
+                category=AnalysisCategory.ARCHITECTURE,
+                priority=PriorityLevel.MEDIUM,
+                confidence=0.6,
+                location=self._get_file_location(file_diff.file_path),
+                title="Potential god object",
+                description=f"File has {function_count} functions - may have too many responsibilities",
+                suggestion="Consider splitting into smaller, focused classes/modules",
+                metadata={"function_count": function_count, "issue_type": "god_object"}
+            )
 
 
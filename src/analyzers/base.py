@@ -1,14 +1,54 @@
 """Base analyzer interface"""
 
 from abc import ABC, abstractmethod
-from typing import List
-from ..models.review import CodeReviewRequest
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from ..models.review import CodeReviewRequest, CodeLocation, FileDiff
 from ..models.analysis import AnalysisResult
 
 
+# Lowercased diffs of the review in progress, keyed by id(file_diff), so the
+# analyzers of one review share a copy without keeping it past the review
+_lowercase_diffs: ContextVar[Optional[Dict[int, Tuple[str, str]]]] = ContextVar(
+    "lowercase_diffs", default=None
+)
+
+
+@contextmanager
+def shared_diff_cache() -> Iterator[None]:
+    """Share lowercased diffs between the analyzers run inside this block"""
+    token = _lowercase_diffs.set({})
+    try:
+        yield
+    finally:
+        _lowercase_diffs.reset(token)
+
+
+@lru_cache(maxsize=4096)
+def _file_location(file_path: str) -> CodeLocation:
+    """
+    File-level location for file_path.
+    
+    Every result for a file points at the same location, so one instance is
+    shared instead of building (and validating) a new model per result.
+    """
+    return CodeLocation(
+        file_path=file_path,
+        line_start=1,
+        line_end=1
+    )
+
+
 class BaseAnalyzer(ABC):
     """Base class for all code analyzers"""
     
+    # Diffs larger than this are treated as generated and not scanned
+    MAX_SCAN_SIZE = 2_000_000
+    # Lockfiles, minified bundles and other build artifacts
+    GENERATED_SUFFIXES = (".lock", ".min.js", ".map", ".svg")
+    
     def __init__(self, name: str):
         self.name = name
     
@@ -33,6 +73,35 @@ class BaseAnalyzer(ABC):
         """Filter results by minimum confidence threshold"""
         return [r for r in results if r.confidence >= min_confidence]
     
+    def _should_scan(self, file_diff: FileDiff) -> bool:
+        """Cheap gate that skips removed, binary, huge and generated files"""
+        return (
+            file_diff.status != "removed"
+            and file_diff.language != "binary"
+            and len(file_diff.diff) < self.MAX_SCAN_SIZE
+            and not file_diff.file_path.endswith(self.GENERATED_SUFFIXES)
+        )
+    
+    def _scannable_files(self, request: CodeReviewRequest) -> List[FileDiff]:
+        """Return the files of a request worth scanning"""
+        return [file_diff for file_diff in request.diff if self._should_scan(file_diff)]
+    
+    def _diff_lower(self, file_diff) -> str:
+        """Return the lowercased diff of a file, computed once per review across analyzers"""
+        cache = _lowercase_diffs.get()
+        if cache is None:
+            return file_diff.diff.lower()
+        
+        entry = cache.get(id(file_diff))
+        # The diff text is checked too, in case the file's diff was replaced
+        if entry is None or entry[0] is not file_diff.diff:
+            entry = cache[id(file_diff)] = (file_diff.diff, file_diff.diff.lower())
+        return entry[1]
+    
+    def _get_file_location(self, file_path: str) -> CodeLocation:
+        """Create a basic file-level location"""
+        return _file_location(file_path)
+    
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(name={self.name})"
 
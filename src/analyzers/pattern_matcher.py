@@ -1,10 +1,93 @@
 """Historical pattern detection analyzer"""
 
+import asyncio
+import os
 import re
-from typing import List, Dict, Tuple
-from ..models.review import CodeReviewRequest, CodeLocation
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
+from typing import List, Dict, FrozenSet, Optional, Set, Tuple
+from ..models.review import CodeReviewRequest, CodeLocation, FileDiff
 from ..models.analysis import AnalysisResult, AnalysisCategory, PriorityLevel
 from .base import BaseAnalyzer
+from ._diff_scan import index_added_lines, find_pattern_matches
+
+try:
+    import hyperscan
+except ImportError:  # Optional: without it every pattern is run against every diff
+    hyperscan = None
+
+
+# Files are scanned in worker threads shared by every PatternMatcher
+_FILE_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="pattern-matcher")
+
+
+@dataclass(frozen=True, slots=True)
+class _CompiledPatterns:
+    """Compiled form of a pattern set, in pattern id order"""
+    regexes: Tuple[re.Pattern, ...]
+    # ASCII-mode variants take re's narrower, faster character classes;
+    # they match identically on ASCII-only text
+    ascii_regexes: Tuple[re.Pattern, ...]
+    prefilter_db: Optional[object]
+    unfiltered_ids: FrozenSet[int]
+    # Per-thread hyperscan scratch for prefilter_db (scans can't share one)
+    local: threading.local
+
+
+def _build_prefilter_db(expressions: Tuple[str, ...]) -> Tuple[Optional[object], Set[int]]:
+    """
+    Compile all patterns into one hyperscan database.
+    
+    The database is only a prefilter: one pass over a diff tells which
+    patterns match anywhere in it, and only those are run with `re` to
+    produce the actual line-level matches. Patterns hyperscan cannot
+    compile (e.g. lookarounds in custom patterns) are always run.
+    """
+    all_ids = set(range(len(expressions)))
+    if hyperscan is None:
+        return None, all_ids
+    
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SINGLEMATCH
+    supported = []
+    unfiltered = set()
+    for pattern_id, pattern in enumerate(expressions):
+        expression = pattern.encode()
+        try:
+            hyperscan.Database().compile(expressions=[expression], flags=flags)
+        except hyperscan.error:
+            unfiltered.add(pattern_id)
+            continue
+        supported.append((pattern_id, expression))
+    
+    if not supported:
+        return None, all_ids
+    
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[expression for _, expression in supported],
+        ids=[pattern_id for pattern_id, _ in supported],
+        elements=len(supported),
+        flags=[flags] * len(supported)
+    )
+    return database, unfiltered
+
+
+@lru_cache(maxsize=32)
+def _compile_patterns(expressions: Tuple[str, ...]) -> _CompiledPatterns:
+    """Compile a pattern set once per process and share it across instances"""
+    prefilter_db, unfiltered_ids = _build_prefilter_db(expressions)
+    return _CompiledPatterns(
+        regexes=tuple(re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in expressions),
+        ascii_regexes=tuple(
+            re.compile(pattern, re.IGNORECASE | re.MULTILINE | re.ASCII) for pattern in expressions
+        ),
+        prefilter_db=prefilter_db,
+        unfiltered_ids=frozenset(unfiltered_ids),
+        local=threading.local()
+    )
 
 
 class PatternMatcher(BaseAnalyzer):
@@ -65,88 +148,135 @@ class PatternMatcher(BaseAnalyzer):
         },
     }
     
+    # Added lines longer than this are not scanned
+    MAX_LINE_LENGTH = 4096
+    # Small files are handed to the workers in batches of about this many characters
+    FILE_BATCH_SIZE = 64 * 1024
+    
     def __init__(self, custom_patterns: Dict = None):
         super().__init__("PatternMatcher")
         self.patterns = {**self.ANTI_PATTERNS}
         if custom_patterns:
             self.patterns.update(custom_patterns)
+        
+        # Pattern names in hyperscan id order
+        self._pattern_order = list(self.patterns)
+        
+        # Instances with the same pattern set (e.g. one per request) share
+        # the compiled regexes and hyperscan database
+        compiled = _compile_patterns(tuple(self.patterns[name]["pattern"] for name in self._pattern_order))
+        self._compiled = dict(zip(self._pattern_order, compiled.regexes))
+        self._compiled_ascii = dict(zip(self._pattern_order, compiled.ascii_regexes))
+        self._prefilter_db = compiled.prefilter_db
+        self._unfiltered_ids = compiled.unfiltered_ids
+        self._local = compiled.local
     
     async def analyze(self, request: CodeReviewRequest) -> List[AnalysisResult]:
         """Analyze code for known anti-patterns"""
+        # Scan batches of files concurrently off the event loop
+        loop = asyncio.get_running_loop()
+        batch_results = await asyncio.gather(*(
+            loop.run_in_executor(_FILE_EXECUTOR, self._scan_batch, batch)
+            for batch in self._batch_files(request.diff)
+        ))
+        results = list(chain.from_iterable(batch_results))
+        
+        return self._filter_by_confidence(results, min_confidence=0.5)
+    
+    def _batch_files(self, file_diffs: List[FileDiff]) -> List[List[FileDiff]]:
+        """
+        Group consecutive files into batches of about FILE_BATCH_SIZE.
+        
+        Most diffs are small, so one worker task per file is mostly dispatch
+        overhead; a batch is scanned by one worker with one hyperscan scratch.
+        """
+        batches = []
+        batch = []
+        batch_size = 0
+        for file_diff in file_diffs:
+            batch.append(file_diff)
+            batch_size += len(file_diff.diff)
+            if batch_size >= self.FILE_BATCH_SIZE:
+                batches.append(batch)
+                batch = []
+                batch_size = 0
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _scan_batch(self, file_diffs: List[FileDiff]) -> List[AnalysisResult]:
+        """Find anti-pattern matches in a batch of files"""
+        return [result for file_diff in file_diffs for result in self._scan_file(file_diff)]
+    
+    def _scan_file(self, file_diff) -> List[AnalysisResult]:
+        """Find anti-pattern matches in a single file"""
         results = []
         
-        for file_diff in request.diff:
-            if file_diff.status == "removed":
-                continue
-            
-            # Skip binary files
-            if not file_diff.language or file_diff.language == "binary":
-                continue
+        if not self._should_scan(file_diff):
+            return results
+        
+        # Skip files of unknown language
+        if not file_diff.language:
+            return results
+        
+        candidates = self._candidate_patterns(file_diff.diff)
+        if not candidates:
+            return results
+        
+        # Index the added lines once and share them across patterns
+        added_lines = index_added_lines(file_diff.diff, self.MAX_LINE_LENGTH)
+        
+        # str.isascii() is O(1); non-ASCII diffs keep full Unicode matching
+        compiled = self._compiled_ascii if file_diff.diff.isascii() else self._compiled
+        
+        # Check each pattern that can match somewhere in the diff
+        for pattern_name in candidates:
+            pattern_config = self.patterns[pattern_name]
+            matches = find_pattern_matches(added_lines, compiled[pattern_name])
             
-            # Check each pattern
-            for pattern_name, pattern_config in self.patterns.items():
-                matches = self._find_pattern_matches(
-                    file_diff.diff, 
-                    pattern_config["pattern"],
-                    file_diff.file_path
+            for line_number, snippet in matches:
+                result = AnalysisResult(
+                    category=pattern_config["category"],
+                    priority=pattern_config["priority"],
+                    confidence=pattern_config["confidence"],
+                    location=CodeLocation(
+                        file_path=file_diff.file_path,
+                        line_start=line_number,
+                        line_end=line_number
+                    ),
+                    title=pattern_config["message"],
+                    description=f"Found {pattern_name} pattern in {file_diff.file_path}",
+                    suggestion=pattern_config["suggestion"],
+                    code_snippet=snippet,
+                    metadata={"pattern_name": pattern_name}
                 )
-                
-                for match in matches:
-                    result = AnalysisResult(
-                        category=pattern_config["category"],
-                        priority=pattern_config["priority"],
-                        confidence=pattern_config["confidence"],
-                        location=match["location"],
-                        title=pattern_config["message"],
-                        description=f"Found {pattern_name} pattern in {file_diff.file_path}",
-                        suggestion=pattern_config["suggestion"],
-                        code_snippet=match.get("snippet"),
-                        metadata={"pattern_name": pattern_name}
-                    )
-                    results.append(result)
+                results.append(result)
         
-        return self._filter_by_confidence(results, min_confidence=0.5)
+        return results
     
-    def _find_pattern_matches(
-        self, 
-        diff_content: str, 
-        pattern: str, 
-        file_path: str
-    ) -> List[Dict]:
-        """Find all matches of a pattern in diff content"""
-        matches = []
-        regex = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+    def _candidate_patterns(self, diff_content: str) -> List[str]:
+        """Return the names of the patterns that may match in diff_content"""
+        if self._prefilter_db is None:
+            return self._pattern_order
         
-        # Parse diff to get line numbers
-        lines = diff_content.split('\n')
-        current_line = 0
+        hits = set(self._unfiltered_ids)
         
-        for line in lines:
-            # Skip diff headers
-            if line.startswith(('---', '+++', '@@', 'diff')):
-                continue
-            
-            # Track line numbers (lines starting with + are additions)
-            if line.startswith('+') and not line.startswith('+++'):
-                current_line += 1
-                line_content = line[1:]  # Remove + prefix
-                
-                for match in regex.finditer(line_content):
-                    # Estimate line number (simplified)
-                    location = CodeLocation(
-                        file_path=file_path,
-                        line_start=current_line,
-                        line_end=current_line
-                    )
-                    
-                    matches.append({
-                        "location": location,
-                        "snippet": line_content[max(0, match.start()-20):match.end()+20]
-                    })
-            elif not line.startswith('-'):
-                current_line += 1
+        def on_match(pattern_id, start, end, flags, context):
+            hits.add(pattern_id)
         
-        return matches
+        self._prefilter_db.scan(
+            diff_content.encode("utf-8", "replace"),
+            match_event_handler=on_match,
+            scratch=self._scratch()
+        )
+        return [name for pattern_id, name in enumerate(self._pattern_order) if pattern_id in hits]
+    
+    def _scratch(self):
+        """Return this thread's hyperscan scratch space (scans can't share one concurrently)"""
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = hyperscan.Scratch(self._prefilter_db)
+        return scratch
 
 
 
@@ -1,10 +1,21 @@
 """Performance impact predictor"""
 
-from typing import List
-from ..models.review import CodeReviewRequest
+import re
+from collections import Counter
+from typing import Iterator, List
+from ..models.review import CodeReviewRequest, FileDiff
 from ..models.analysis import AnalysisResult, AnalysisCategory, PriorityLevel
 from .base import BaseAnalyzer
 
+try:
+    import ahocorasick
+except ImportError:  # Optional: fall back to plain substring counts
+    ahocorasick = None
+
+
+# API/controller layer paths, where added loops sit on the request path
+_HOT_PATH_RE = re.compile(r"api|controller|handler|route", re.IGNORECASE)
+
 
 class PerformancePredictor(BaseAnalyzer):
     """
@@ -12,212 +23,240 @@ class PerformancePredictor(BaseAnalyzer):
     Identifies patterns that may cause performance regressions.
     """
     
+    # Literal keywords the checks look for in the lowercased diff
+    KEYWORDS = (
+        "for", "while", "for ", "while ", "in ", "[", "+=",
+        "query", "get_by", "find_by", "select", "where", "index",
+        "async def", "async function", "await", "asyncio.gather", "asyncio.create_task",
+        "requests.get", "requests.post", "urllib", "time.sleep",
+        "select *", "find_all", "get_all", "list()", "limit", "paginate",
+    )
+    
+    # Static fields of each finding; only location and metadata vary per file
+    ISSUE_TEMPLATES = {
+        "n_plus_one": {
+            "category": AnalysisCategory.PERFORMANCE,
+            "priority": PriorityLevel.MEDIUM,
+            "confidence": 0.6,
+            "title": "Potential N+1 query pattern",
+            "description": "Database query detected inside loop, which may cause N+1 problem",
+            "suggestion": "Consider using eager loading, batch queries, or data prefetching"
+        },
+        "nested_loops": {
+            "category": AnalysisCategory.PERFORMANCE,
+            "priority": PriorityLevel.LOW,
+            "confidence": 0.5,
+            "title": "Nested loops detected",
+            "description": "Multiple nested loops may cause performance issues with large datasets",
+            "suggestion": "Consider optimizing algorithm complexity or using vectorized operations"
+        },
+        "missing_index": {
+            "category": AnalysisCategory.PERFORMANCE,
+            "priority": PriorityLevel.LOW,
+            "confidence": 0.4,
+            "title": "Query may benefit from index",
+            "description": "WHERE clause detected - ensure appropriate indexes exist",
+            "suggestion": "Verify database indexes exist for columns used in WHERE clauses"
+        },
+        "hot_path_loop": {
+            "category": AnalysisCategory.PERFORMANCE,
+            "priority": PriorityLevel.MEDIUM,
+            "confidence": 0.65,
+            "title": "Potential performance regression in hot path",
+            "description": "Loop detected in API/controller layer - may impact request latency",
+            "suggestion": "Consider moving heavy computation to background jobs or optimizing loop complexity"
+        },
+        "blocking_io": {
+            "category": AnalysisCategory.PERFORMANCE,
+            "priority": PriorityLevel.HIGH,
+            "confidence": 0.7,
+            "title": "Blocking I/O in async function",
+            "description": "Synchronous I/O detected in async context - blocks event loop",
+            "suggestion": "Use async/await compatible libraries (aiohttp, httpx) instead of blocking calls"
+        },
+        "no_pagination": {
+            "category": AnalysisCategory.PERFORMANCE,
+            "priority": PriorityLevel.MEDIUM,
+            "confidence": 0.6,
+            "title": "Potential memory issue - no pagination",
+            "description": "Query fetches all records without pagination - may cause memory issues",
+            "suggestion": "Add pagination or limit clause to prevent loading large datasets"
+        },
+        "nested_comprehension": {
+            "category": AnalysisCategory.PERFORMANCE,
+            "priority": PriorityLevel.LOW,
+            "confidence": 0.5,
+            "title": "Nested list comprehension detected",
+            "description": "Complex nested comprehension may consume significant memory",
+            "suggestion": "Consider using generator expressions or breaking into multiple steps"
+        },
+        "string_concat": {
+            "category": AnalysisCategory.PERFORMANCE,
+            "priority": PriorityLevel.MEDIUM,
+            "confidence": 0.6,
+            "title": "String concatenation in loop",
+            "description": "String concatenation in loops creates new objects each iteration",
+            "suggestion": "Use list.join() or string builder pattern for better performance"
+        },
+        "sequential_await": {
+            "category": AnalysisCategory.PERFORMANCE,
+            "priority": PriorityLevel.MEDIUM,
+            "confidence": 0.65,
+            "title": "Sequential await in loop",
+            "description": "Awaiting in loop processes items sequentially - may be slow",
+            "suggestion": "Use asyncio.gather() or asyncio.create_task() for parallel processing"
+        },
+    }
+    
     def __init__(self):
         super().__init__("PerformancePredictor")
+        self._automaton = self._build_automaton(self.KEYWORDS)
     
     async def analyze(self, request: CodeReviewRequest) -> List[AnalysisResult]:
         """Analyze code for performance issues and regression risks"""
-        results = []
+        # Single pass over the files: count keywords once per file and run
+        # every check against those counts, filtering as results stream out
+        results = [
+            result
+            for file_diff in self._scannable_files(request)
+            for result in self._analyze_file(file_diff)
+            if result.confidence >= 0.5
+        ]
+        
+        return results
+    
+    def _analyze_file(self, file_diff: FileDiff) -> Iterator[AnalysisResult]:
+        """Run all checks against keyword counts gathered in one scan of the diff"""
+        hits = self._count_keywords(self._diff_lower(file_diff))
         
         # Check for N+1 query patterns
-        results.extend(await self._check_n_plus_one(request))
+        yield from self._check_n_plus_one(file_diff, hits)
         
         # Check for inefficient loops
-        results.extend(await self._check_inefficient_loops(request))
+        yield from self._check_inefficient_loops(file_diff, hits)
         
         # Check for missing indexes
-        results.extend(await self._check_missing_indexes(request))
+        yield from self._check_missing_indexes(file_diff, hits)
         
         # Performance regression prediction
-        results.extend(await self._predict_regressions(request))
-        results.extend(await self._check_memory_issues(request))
-        results.extend(await self._check_async_patterns(request))
-        
-        return self._filter_by_confidence(results, min_confidence=0.5)
+        yield from self._predict_regressions(file_diff, hits)
+        yield from self._check_memory_issues(file_diff, hits)
+        yield from self._check_async_patterns(file_diff, hits)
     
-    async def _check_n_plus_one(self, request: CodeReviewRequest) -> List[AnalysisResult]:
-        """Check for N+1 query patterns"""
-        results = []
-        
-        for file_diff in request.diff:
-            # Look for loops with database queries inside
-            if "for" in file_diff.diff.lower() or "while" in file_diff.diff.lower():
-                if any(keyword in file_diff.diff.lower() for keyword in ["query", "get_by", "find_by", "select"]):
-                    results.append(AnalysisResult(
-                        category=AnalysisCategory.PERFORMANCE,
-                        priority=PriorityLevel.MEDIUM,
-                        confidence=0.6,
-                        location=self._get_file_location(file_diff.file_path),
-                        title="Potential N+1 query pattern",
-                        description="Database query detected inside loop, which may cause N+1 problem",
-                        suggestion="Consider using eager loading, batch queries, or data prefetching",
-                        metadata={"issue_type": "n_plus_one"}
-                    ))
+    def _build_automaton(self, keywords):
+        """Compile keywords into an Aho-Corasick automaton (None if unavailable)"""
+        if ahocorasick is None:
+            return None
         
-        return results
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
     
-    async def _check_inefficient_loops(self, request: CodeReviewRequest) -> List[AnalysisResult]:
-        """Check for inefficient loop patterns"""
-        results = []
+    def _count_keywords(self, diff_lower: str) -> Counter:
+        """Count occurrences of each keyword in the lowercased diff"""
+        if self._automaton is None:
+            return Counter({keyword: diff_lower.count(keyword) for keyword in self.KEYWORDS})
         
-        for file_diff in request.diff:
-            # Look for nested loops with large datasets
-            loop_count = file_diff.diff.lower().count("for ") + file_diff.diff.lower().count("while ")
-            if loop_count >= 2:
-                results.append(AnalysisResult(
-                    category=AnalysisCategory.PERFORMANCE,
-                    priority=PriorityLevel.LOW,
-                    confidence=0.5,
-                    location=self._get_file_location(file_diff.file_path),
-                    title="Nested loops detected",
-                    description="Multiple nested loops may cause performance issues with large datasets",
-                    suggestion="Consider optimizing algorithm complexity or using vectorized operations",
-                    metadata={"loop_count": loop_count}
-                ))
-        
-        return results
+        # Single linear pass over the diff for all keywords
+        return Counter(keyword for _, keyword in self._automaton.iter(diff_lower))
     
-    async def _check_missing_indexes(self, request: CodeReviewRequest) -> List[AnalysisResult]:
-        """Check for missing database indexes"""
-        results = []
-        
-        for file_diff in request.diff:
-            # Look for WHERE clauses without indexes
-            if "where" in file_diff.diff.lower() and "index" not in file_diff.diff.lower():
-                # Simple heuristic - in production, analyze actual queries
-                results.append(AnalysisResult(
-                    category=AnalysisCategory.PERFORMANCE,
-                    priority=PriorityLevel.LOW,
-                    confidence=0.4,
+    def _check_n_plus_one(self, file_diff: FileDiff, hits: Counter) -> Iterator[AnalysisResult]:
+        """Check for N+1 query patterns"""
+        # Look for loops with database queries inside
+        if hits["for"] or hits["while"]:
+            if any(hits[keyword] for keyword in ["query", "get_by", "find_by", "select"]):
+                yield AnalysisResult(
+                    **self.ISSUE_TEMPLATES["n_plus_one"],
                     location=self._get_file_location(file_diff.file_path),
-                    title="Query may benefit from index",
-                    description="WHERE clause detected - ensure appropriate indexes exist",
-                    suggestion="Verify database indexes exist for columns used in WHERE clauses",
-                    metadata={"issue_type": "missing_index"}
-                ))
-        
-        return results
+                    metadata={"issue_type": "n_plus_one"}
+                )
     
-    def _get_file_location(self, file_path: str):
-        """Create a basic file-level location"""
-        from ..models.review import CodeLocation
-        return CodeLocation(
-            file_path=file_path,
-            line_start=1,
-            line_end=1
-        )
+    def _check_inefficient_loops(self, file_diff: FileDiff, hits: Counter) -> Iterator[AnalysisResult]:
+        """Check for inefficient loop patterns"""
+        # Look for nested loops with large datasets
+        loop_count = hits["for "] + hits["while "]
+        if loop_count >= 2:
+            yield AnalysisResult(
+                **self.ISSUE_TEMPLATES["nested_loops"],
+                location=self._get_file_location(file_diff.file_path),
+                metadata={"loop_count": loop_count}
+            )
     
-    async def _predict_regressions(self, request: CodeReviewRequest) -> List[AnalysisResult]:
+    def _check_missing_indexes(self, file_diff: FileDiff, hits: Counter) -> Iterator[AnalysisResult]:
+        """Check for missing database indexes"""
+        # Look for WHERE clauses without indexes
+        if hits["where"] and not hits["index"]:
+            # Simple heuristic - in production, analyze actual queries
+            yield AnalysisResult(
+                **self.ISSUE_TEMPLATES["missing_index"],
+                location=self._get_file_location(file_diff.file_path),
+                metadata={"issue_type": "missing_index"}
+            )
+    
+    def _predict_regressions(self, file_diff: FileDiff, hits: Counter) -> Iterator[AnalysisResult]:
         """Predict potential performance regressions"""
-        results = []
+        # Check for new loops in hot paths
+        if _HOT_PATH_RE.search(file_diff.file_path):
+            loop_count = hits["for "] + hits["while "]
+            if loop_count > 0:
+                yield AnalysisResult(
+                    **self.ISSUE_TEMPLATES["hot_path_loop"],
+                    location=self._get_file_location(file_diff.file_path),
+                    metadata={"loop_count": loop_count, "risk_level": "medium"}
+                )
         
-        for file_diff in request.diff:
-            diff_lower = file_diff.diff.lower()
-            
-            # Check for new loops in hot paths
-            if any(path in file_diff.file_path.lower() for path in ["api", "controller", "handler", "route"]):
-                loop_count = diff_lower.count("for ") + diff_lower.count("while ")
-                if loop_count > 0:
-                    results.append(AnalysisResult(
-                        category=AnalysisCategory.PERFORMANCE,
-                        priority=PriorityLevel.MEDIUM,
-                        confidence=0.65,
-                        location=self._get_file_location(file_diff.file_path),
-                        title="Potential performance regression in hot path",
-                        description="Loop detected in API/controller layer - may impact request latency",
-                        suggestion="Consider moving heavy computation to background jobs or optimizing loop complexity",
-                        metadata={"loop_count": loop_count, "risk_level": "medium"}
-                    ))
-            
-            # Check for synchronous I/O in async contexts
-            if "async def" in diff_lower or "async function" in diff_lower:
-                if any(blocking in diff_lower for blocking in ["requests.get", "requests.post", "urllib", "time.sleep"]):
-                    results.append(AnalysisResult(
-                        category=AnalysisCategory.PERFORMANCE,
-                        priority=PriorityLevel.HIGH,
-                        confidence=0.7,
-                        location=self._get_file_location(file_diff.file_path),
-                        title="Blocking I/O in async function",
-                        description="Synchronous I/O detected in async context - blocks event loop",
-                        suggestion="Use async/await compatible libraries (aiohttp, httpx) instead of blocking calls",
-                        metadata={"risk_level": "high", "issue_type": "blocking_io"}
-                    ))
-            
-            # Check for large data processing without pagination
-            if any(keyword in diff_lower for keyword in ["select *", "find_all", "get_all", "list()"]):
-                if "limit" not in diff_lower and "paginate" not in diff_lower:
-                    results.append(AnalysisResult(
-                        category=AnalysisCategory.PERFORMANCE,
-                        priority=PriorityLevel.MEDIUM,
-                        confidence=0.6,
-                        location=self._get_file_location(file_diff.file_path),
-                        title="Potential memory issue - no pagination",
-                        description="Query fetches all records without pagination - may cause memory issues",
-                        suggestion="Add pagination or limit clause to prevent loading large datasets",
-                        metadata={"risk_level": "medium", "issue_type": "no_pagination"}
-                    ))
+        # Check for synchronous I/O in async contexts
+        if hits["async def"] or hits["async function"]:
+            if any(hits[blocking] for blocking in ["requests.get", "requests.post", "urllib", "time.sleep"]):
+                yield AnalysisResult(
+                    **self.ISSUE_TEMPLATES["blocking_io"],
+                    location=self._get_file_location(file_diff.file_path),
+                    metadata={"risk_level": "high", "issue_type": "blocking_io"}
+                )
         
-        return results
+        # Check for large data processing without pagination
+        if any(hits[keyword] for keyword in ["select *", "find_all", "get_all", "list()"]):
+            if not hits["limit"] and not hits["paginate"]:
+                yield AnalysisResult(
+                    **self.ISSUE_TEMPLATES["no_pagination"],
+                    location=self._get_file_location(file_diff.file_path),
+                    metadata={"risk_level": "medium", "issue_type": "no_pagination"}
+                )
     
-    async def _check_memory_issues(self, request: CodeReviewRequest) -> List[AnalysisResult]:
+    def _check_memory_issues(self, file_diff: FileDiff, hits: Counter) -> Iterator[AnalysisResult]:
         """Check for potential memory issues"""
-        results = []
-        
-        for file_diff in request.diff:
-            diff_lower = file_diff.diff.lower()
-            
-            # Check for large list/dict comprehensions
-            if "[" in diff_lower and "for " in diff_lower and "in " in diff_lower:
-                # Check if it's a nested comprehension (potential memory issue)
-                if diff_lower.count("[") > 2:
-                    results.append(AnalysisResult(
-                        category=AnalysisCategory.PERFORMANCE,
-                        priority=PriorityLevel.LOW,
-                        confidence=0.5,
-                        location=self._get_file_location(file_diff.file_path),
-                        title="Nested list comprehension detected",
-                        description="Complex nested comprehension may consume significant memory",
-                        suggestion="Consider using generator expressions or breaking into multiple steps",
-                        metadata={"issue_type": "memory_usage"}
-                    ))
-            
-            # Check for string concatenation in loops
-            if ("for " in diff_lower or "while " in diff_lower) and ("+=" in diff_lower or "= " + file_diff.file_path.split(".")[-1] + " +" in diff_lower):
-                results.append(AnalysisResult(
-                    category=AnalysisCategory.PERFORMANCE,
-                    priority=PriorityLevel.MEDIUM,
-                    confidence=0.6,
+        # Check for large list/dict comprehensions
+        if hits["["] and hits["for "] and hits["in "]:
+            # Check if it's a nested comprehension (potential memory issue)
+            if hits["["] > 2:
+                yield AnalysisResult(
+                    **self.ISSUE_TEMPLATES["nested_comprehension"],
                     location=self._get_file_location(file_diff.file_path),
-                    title="String concatenation in loop",
-                    description="String concatenation in loops creates new objects each iteration",
-                    suggestion="Use list.join() or string builder pattern for better performance",
-                    metadata={"issue_type": "string_concat"}
-                ))
+                    metadata={"issue_type": "memory_usage"}
+                )
         
-        return results
+        # Check for string concatenation in loops
+        if (hits["for "] or hits["while "]) and (
+            hits["+="] or "= " + file_diff.file_path.split(".")[-1] + " +" in self._diff_lower(file_diff)
+        ):
+            yield AnalysisResult(
+                **self.ISSUE_TEMPLATES["string_concat"],
+                location=self._get_file_location(file_diff.file_path),
+                metadata={"issue_type": "string_concat"}
+            )
     
-    async def _check_async_patterns(self, request: CodeReviewRequest) -> List[AnalysisResult]:
+    def _check_async_patterns(self, file_diff: FileDiff, hits: Counter) -> Iterator[AnalysisResult]:
         """Check for async/await performance patterns"""
-        results = []
-        
-        for file_diff in request.diff:
-            diff_lower = file_diff.diff.lower()
-            
-            # Check for await in loops (potential sequential processing)
-            if "await" in diff_lower and ("for " in diff_lower or "while " in diff_lower):
-                if "asyncio.gather" not in diff_lower and "asyncio.create_task" not in diff_lower:
-                    results.append(AnalysisResult(
-                        category=AnalysisCategory.PERFORMANCE,
-                        priority=PriorityLevel.MEDIUM,
-                        confidence=0.65,
-                        location=self._get_file_location(file_diff.file_path),
-                        title="Sequential await in loop",
-                        description="Awaiting in loop processes items sequentially - may be slow",
-                        suggestion="Use asyncio.gather() or asyncio.create_task() for parallel processing",
-                        metadata={"issue_type": "sequential_await"}
-                    ))
-        
-        return results
+        # Check for await in loops (potential sequential processing)
+        if hits["await"] and (hits["for "] or hits["while "]):
+            if not hits["asyncio.gather"] and not hits["asyncio.create_task"]:
+                yield AnalysisResult(
+                    **self.ISSUE_TEMPLATES["sequential_await"],
+                    location=self._get_file_location(file_diff.file_path),
+                    metadata={"issue_type": "sequential_await"}
+                )
 
 
 
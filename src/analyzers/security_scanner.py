@@ -38,10 +38,12 @@ class SecurityScanner(BaseAnalyzer):
         """Check for SQL injection vulnerabilities"""
         results = []
         
-        for file_diff in request.diff:
+        for file_diff in self._scannable_files(request):
             if "sql" in file_diff.file_path.lower() or file_diff.language == "sql":
                 # Look for string concatenation in SQL queries
-                if "SELECT" in file_diff.diff.upper() or "INSERT" in file_diff.diff.upper():
+                # Reuse the shared lowercased diff instead of uppercasing it twice
+                diff_lower = self._diff_lower(file_diff)
+                if "select" in diff_lower or "insert" in diff_lower:
                     # Simple heuristic: f-strings or + operators with user input
                     if any(op in file_diff.diff for op in ["f'SELECT", "f\"SELECT", "+ 'SELECT", "+\"SELECT"]):
                         results.append(AnalysisResult(
@@ -61,10 +63,10 @@ class SecurityScanner(BaseAnalyzer):
         """Check for XSS vulnerabilities"""
         results = []
         
-        for file_diff in request.diff:
+        for file_diff in self._scannable_files(request):
             if file_diff.language in ["html", "javascript", "jsx", "tsx"]:
                 # Look for innerHTML usage without sanitization
-                if "innerHTML" in file_diff.diff and "sanitize" not in file_diff.diff.lower():
+                if "innerHTML" in file_diff.diff and "sanitize" not in self._diff_lower(file_diff):
                     results.append(AnalysisResult(
                         category=AnalysisCategory.SECURITY,
                         priority=PriorityLevel.MEDIUM,
@@ -82,12 +84,14 @@ class SecurityScanner(BaseAnalyzer):
         """Check for authentication/authorization issues"""
         results = []
         
-        for file_diff in request.diff:
+        for file_diff in self._scannable_files(request):
+            diff_lower = self._diff_lower(file_diff)
+            
             # Look for endpoints without authentication checks
-            if any(keyword in file_diff.diff.lower() for keyword in ["@app.route", "def api_", "def endpoint"]):
+            if any(keyword in diff_lower for keyword in ["@app.route", "def api_", "def endpoint"]):
                 if "@require_auth" not in file_diff.diff and "@login_required" not in file_diff.diff:
                     # Check if it's a public endpoint (might be intentional)
-                    if "public" not in file_diff.diff.lower() and "open" not in file_diff.diff.lower():
+                    if "public" not in diff_lower and "open" not in diff_lower:
                         results.append(AnalysisResult(
                             category=AnalysisCategory.SECURITY,
                             priority=PriorityLevel.HIGH,
@@ -107,11 +111,13 @@ class SecurityScanner(BaseAnalyzer):
         
         sensitive_keywords = ["password", "ssn", "credit_card", "api_key", "secret", "token"]
         
-        for file_diff in request.diff:
+        for file_diff in self._scannable_files(request):
+            diff_lower = self._diff_lower(file_diff)
+            
             # Check for logging sensitive data
-            if any(keyword in file_diff.diff.lower() for keyword in ["log", "print", "console.log"]):
+            if any(keyword in diff_lower for keyword in ["log", "print", "console.log"]):
                 for sensitive in sensitive_keywords:
-                    if sensitive in file_diff.diff.lower():
+                    if sensitive in diff_lower:
                         results.append(AnalysisResult(
                             category=AnalysisCategory.SECURITY,
                             priority=PriorityLevel.MEDIUM,
@@ -125,15 +131,6 @@ class SecurityScanner(BaseAnalyzer):
                         break
         
         return results
-    
-    def _get_file_location(self, file_path: str):
-        """Create a basic file-level location"""
-        from ..models.review import CodeLocation
-        return CodeLocation(
-            file_path=file_path,
-            line_start=1,
-            line_end=1
-        )
 
 
 
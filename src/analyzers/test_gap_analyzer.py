@@ -1,11 +1,19 @@
 """Test coverage and quality analyzer"""
 
+import asyncio
+import re
+from pathlib import PurePosixPath
 from typing import List
 from ..models.review import CodeReviewRequest
 from ..models.analysis import AnalysisResult, AnalysisCategory, PriorityLevel
 from .base import BaseAnalyzer
 
 
+# Test-file naming conventions around the covered module's name:
+# test_foo.py, foo_test.go, foo.test.js, foo.spec.ts
+_TEST_AFFIX_RE = re.compile(r'^test_|_test$|\.(?:test|spec)$')
+
+
 class TestGapAnalyzer(BaseAnalyzer):
     """
     Analyzes test coverage and identifies gaps.
@@ -17,13 +25,13 @@ class TestGapAnalyzer(BaseAnalyzer):
     
     async def analyze(self, request: CodeReviewRequest) -> List[AnalysisResult]:
         """Analyze test coverage"""
-        results = []
-        
-        # Check if tests exist for changed files
-        results.extend(await self._check_missing_tests(request))
-        
-        # Check test quality
-        results.extend(await self._check_test_quality(request))
+        # Check if tests exist for changed files, and test quality; the two
+        # checks are independent, so run them concurrently
+        missing_tests, test_quality = await asyncio.gather(
+            self._check_missing_tests(request),
+            self._check_test_quality(request)
+        )
+        results = missing_tests + test_quality
         
         return self._filter_by_confidence(results, min_confidence=0.5)
     
@@ -31,8 +39,13 @@ class TestGapAnalyzer(BaseAnalyzer):
         """Check if changed files have corresponding tests"""
         results = []
         
-        changed_files = {diff.file_path for diff in request.diff if diff.status != "removed"}
-        test_files = {diff.file_path for diff in request.diff if "test" in diff.file_path.lower()}
+        # Index test files once by the name of the module they cover, so each
+        # lookup below is a set membership test instead of a scan of all files
+        test_basenames = {
+            _TEST_AFFIX_RE.sub("", PurePosixPath(diff.file_path).stem.lower())
+            for diff in request.diff
+            if diff.status != "removed" and "test" in diff.file_path.lower()
+        }
         
         # Simple heuristic: check if test files exist
         for file_diff in request.diff:
@@ -44,11 +57,7 @@ class TestGapAnalyzer(BaseAnalyzer):
                 continue
             
             # Check if corresponding test file exists
-            base_name = file_diff.file_path.replace(".py", "").replace(".js", "")
-            has_test = any(
-                base_name in test_file or test_file.replace("test_", "").replace("_test", "") == base_name
-                for test_file in changed_files
-            )
+            has_test = PurePosixPath(file_diff.file_path).stem.lower() in test_basenames
             
             if not has_test and file_diff.changes > 10:  # Only flag significant changes
                 results.append(AnalysisResult(
@@ -73,7 +82,7 @@ class TestGapAnalyzer(BaseAnalyzer):
                 continue
             
             # Check for test quality indicators
-            test_content = file_diff.diff.lower()
+            test_content = self._diff_lower(file_diff)
             
             # Check for assertions
             if "assert" not in test_content and "expect" not in test_content:
@@ -94,15 +103,6 @@ class TestGapAnalyzer(BaseAnalyzer):
                 pass
         
         return results
-    
-    def _get_file_location(self, file_path: str):
-        """Create a basic file-level location"""
-        from ..models.review import CodeLocation
-        return CodeLocation(
-            file_path=file_path,
-            line_start=1,
-            line_end=1
-        )
 
 
 
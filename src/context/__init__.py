@@ -1,13 +1,16 @@
 """Context gathering modules"""
 
-from .github_client import GitHubClient
+from .github_client import GitHubClient, AsyncGitHubClient
 from .historical_analyzer import HistoricalAnalyzer
 from .team_patterns import TeamPatternsLoader
+from .parallel import gather_pr_context
 
 __all__ = [
     "GitHubClient",
+    "AsyncGitHubClient",
     "HistoricalAnalyzer",
     "TeamPatternsLoader",
+    "gather_pr_context",
 ]
 
 
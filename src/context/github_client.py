@@ -1,23 +1,248 @@
 """GitHub API client for fetching context"""
 
-from typing import List, Optional, Dict
-from datetime import datetime, timedelta
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List, Optional, Dict, Tuple
+from datetime import datetime, timedelta, timezone
+import httpx
 from github import Github
 from github.Repository import Repository as GHRepository
 from github.PullRequest import PullRequest
 from github.Issue import Issue as GHIssue
 from ..models.review import Repository, Commit, Issue, FileDiff
 
+try:
+    import h2  # noqa: F401  Enables HTTP/2 in httpx
+    _HTTP2 = True
+except ImportError:  # Optional: stay on HTTP/1.1 keep-alive
+    _HTTP2 = False
+
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Issue references ("#123") in a PR description
+_ISSUE_REF_RE = re.compile(r'#(\d+)')
+
+# PR metadata that would otherwise take a get_repo + get_pull round trip each
+PR_BUNDLE_QUERY = """
+query($owner: String!, $name: String!, $number: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      databaseId
+      number
+      title
+      body
+      state
+      createdAt
+      updatedAt
+      author { login }
+      baseRefName
+      headRefName
+      labels(first: 100) { nodes { name } }
+    }
+  }
+}
+"""
+
+# Fields of an issue (or PR, which GitHub also numbers as issues) referenced as #N
+ISSUE_FIELDS = """
+fragment IssueFields on Issue {
+  number title body state createdAt closedAt labels(first: 100) { nodes { name } }
+}
+fragment PullRequestFields on PullRequest {
+  number title body state createdAt closedAt labels(first: 100) { nodes { name } }
+}
+"""
+
+
+# Dedicated threads for blocking GitHub calls made from async code, so they
+# don't compete with database calls for the event loop's default executor.
+# All such calls go through AsyncGitHubClient, so this is also the one bound
+# on GitHub requests in flight
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="github")
+
+# One connection pool for GraphQL calls from every client, so keep-alive
+# connections outlive a single review; each client sends its own token
+_HTTP_CLIENT = httpx.Client(
+    http2=_HTTP2,
+    limits=httpx.Limits(max_keepalive_connections=32),
+    timeout=30.0
+)
+
+
+def close_http_client():
+    """Close the shared GitHub connection pool (call on application shutdown)"""
+    _HTTP_CLIENT.close()
+
+
+# Language by (lowercase) file extension
+EXTENSION_MAP = {
+    # Python
+    "py": "python",
+    "pyi": "python",
+    "pyx": "python",
+    # JavaScript/TypeScript
+    "js": "javascript",
+    "jsx": "jsx",
+    "mjs": "javascript",
+    "ts": "typescript",
+    "tsx": "tsx",
+    # Java
+    "java": "java",
+    "kt": "kotlin",
+    "scala": "scala",
+    # Go
+    "go": "go",
+    # Rust
+    "rs": "rust",
+    # C/C++
+    "cpp": "cpp",
+    "cc": "cpp",
+    "cxx": "cpp",
+    "c": "c",
+    "h": "c",
+    "hpp": "cpp",
+    # C#
+    "cs": "csharp",
+    # Ruby
+    "rb": "ruby",
+    "rake": "ruby",
+    # PHP
+    "php": "php",
+    "phtml": "php",
+    # Other
+    "sql": "sql",
+    "html": "html",
+    "htm": "html",
+    "css": "css",
+    "scss": "css",
+    "sass": "css",
+    "sh": "shell",
+    "bash": "shell",
+    "zsh": "shell",
+    "yaml": "yaml",
+    "yml": "yaml",
+    "json": "json",
+    "xml": "xml",
+    "swift": "swift",
+    "dart": "dart",
+    "r": "r",
+    "m": "objective-c",
+    "mm": "objective-cpp",
+}
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse a GraphQL DateTime ("2024-01-01T00:00:00Z")"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
 
 class GitHubClient:
     """Client for interacting with GitHub API"""
     
+    # Seconds fetched repositories, PRs and PR bundles are reused, so the
+    # calls that build one review share them without serving stale data later
+    CACHE_TTL = 60
+    # Connections kept open to the API; reviews issue many calls concurrently
+    POOL_SIZE = 20
+    # Items per page for paginated lists (files, commits, PRs); the API
+    # maximum, versus PyGithub's default of 30
+    PER_PAGE = 100
+    
     def __init__(self, token: str):
-        self.github = Github(token)
+        # PyGithub keeps one keep-alive session per client; size its pool for
+        # the concurrent calls so connections are reused instead of re-handshaked
+        self.github = Github(token, per_page=self.PER_PAGE, pool_size=self.POOL_SIZE)
+        self._graphql_headers = {"Authorization": f"bearer {token}"}
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._in_flight: Dict[Tuple, Future] = {}
+        self._cache_lock = threading.Lock()
+    
+    def _cached(self, key: Tuple, fetch: Callable[[], Any]) -> Any:
+        """
+        Return the value cached under key, calling fetch if it is missing or expired.
+        
+        Concurrent callers for the same key wait for a single fetch instead of
+        each making the request.
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached and now - cached[0] < self.CACHE_TTL:
+                return cached[1]
+            
+            pending = self._in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._in_flight[key] = Future()
+        
+        if not owner:
+            return pending.result()
+        
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._cache_lock:
+                del self._in_flight[key]
+            pending.set_exception(e)
+            raise
+        
+        with self._cache_lock:
+            del self._in_flight[key]
+            if value is not None:
+                # Drop expired entries so the cache stays bounded
+                self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self.CACHE_TTL}
+                self._cache[key] = (now, value)
+        pending.set_result(value)
+        return value
+    
+    def _get_repo(self, owner: str, name: str) -> GHRepository:
+        """Get the PyGithub repository object, reused across calls"""
+        return self._cached(("repo", owner, name), lambda: self.github.get_repo(f"{owner}/{name}"))
+    
+    def _get_pr(self, owner: str, name: str, pr_number: int) -> PullRequest:
+        """Get the PyGithub pull request object, reused across calls"""
+        return self._cached(
+            ("pr", owner, name, pr_number),
+            lambda: self._get_repo(owner, name).get_pull(pr_number)
+        )
+    
+    def _graphql(self, query: str, variables: Dict[str, Any]) -> Optional[Dict]:
+        """Run a GraphQL query; returns its data, or None if the request failed"""
+        try:
+            response = _HTTP_CLIENT.post(
+                GRAPHQL_URL,
+                json={"query": query, "variables": variables},
+                headers=self._graphql_headers
+            )
+            response.raise_for_status()
+            return response.json().get("data")
+        except Exception as e:
+            print(f"Error running GitHub GraphQL query: {e}")
+            return None
+    
+    def get_pr_bundle(self, owner: str, name: str, pr_number: int) -> Optional[Dict]:
+        """
+        Get pull request metadata in a single GraphQL request.
+        
+        Results are cached for CACHE_TTL seconds per PR. Returns None if the
+        GraphQL API is unavailable, in which case callers fall back to REST.
+        """
+        def fetch() -> Optional[Dict]:
+            data = self._graphql(PR_BUNDLE_QUERY, {"owner": owner, "name": name, "number": pr_number})
+            return ((data or {}).get("repository") or {}).get("pullRequest")
+        
+        return self._cached(("bundle", owner, name, pr_number), fetch)
     
     def get_repository(self, owner: str, name: str) -> Repository:
         """Get repository information"""
-        repo = self.github.get_repo(f"{owner}/{name}")
+        repo = self._get_repo(owner, name)
         
         languages = {}
         try:
@@ -36,8 +261,24 @@ class GitHubClient:
     
     def get_pr_details(self, owner: str, name: str, pr_number: int) -> Dict:
         """Get pull request details"""
-        repo = self.github.get_repo(f"{owner}/{name}")
-        pr = repo.get_pull(pr_number)
+        bundle = self.get_pr_bundle(owner, name, pr_number)
+        if bundle is not None:
+            return {
+                "id": str(bundle["databaseId"]),
+                "number": bundle["number"],
+                "title": bundle["title"],
+                "description": bundle["body"],
+                "author": (bundle["author"] or {}).get("login", "ghost"),
+                "base_branch": bundle["baseRefName"],
+                "head_branch": bundle["headRefName"],
+                # REST reports merged PRs as closed
+                "state": "open" if bundle["state"] == "OPEN" else "closed",
+                "created_at": _parse_datetime(bundle["createdAt"]),
+                "updated_at": _parse_datetime(bundle["updatedAt"]),
+                "labels": [label["name"] for label in bundle["labels"]["nodes"]],
+            }
+        
+        pr = self._get_pr(owner, name, pr_number)
         
         return {
             "id": str(pr.id),
@@ -55,8 +296,7 @@ class GitHubClient:
     
     def get_pr_diff(self, owner: str, name: str, pr_number: int) -> List[FileDiff]:
         """Get file diffs for a pull request"""
-        repo = self.github.get_repo(f"{owner}/{name}")
-        pr = repo.get_pull(pr_number)
+        pr = self._get_pr(owner, name, pr_number)
         
         files = pr.get_files()
         diffs = []
@@ -80,49 +320,67 @@ class GitHubClient:
     
     def get_commits(self, owner: str, name: str, pr_number: int) -> List[Commit]:
         """Get commits for a pull request"""
-        repo = self.github.get_repo(f"{owner}/{name}")
-        pr = repo.get_pull(pr_number)
+        pr = self._get_pr(owner, name, pr_number)
         
         commits = []
         for commit in pr.get_commits():
             commit_obj = commit.commit
+            # The commit's own totals, instead of summing over its files
+            stats = commit.stats
             commits.append(Commit(
                 sha=commit.sha,
                 message=commit_obj.message,
                 author=commit_obj.author.name,
                 timestamp=commit_obj.author.date,
                 files_changed=[f.filename for f in commit.files],
-                additions=sum(f.additions for f in commit.files),
-                deletions=sum(f.deletions for f in commit.files)
+                additions=stats.additions,
+                deletions=stats.deletions
             ))
         
         return commits
     
-    def get_related_prs(self, owner: str, name: str, pr_number: int, days: int = 30) -> List[str]:
+    def get_related_prs(
+        self,
+        owner: str,
+        name: str,
+        pr_number: int,
+        days: int = 30,
+        limit: int = 10
+    ) -> List[str]:
         """Get related PRs from the last N days"""
-        repo = self.github.get_repo(f"{owner}/{name}")
-        cutoff_date = datetime.now() - timedelta(days=days)
+        repo = self._get_repo(owner, name)
+        # PyGithub returns timezone-aware UTC datetimes
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
         
+        # Newest first, and stop as soon as we have enough: pages are only
+        # fetched as the iteration consumes them
         related_prs = []
-        for pr in repo.get_pulls(state="all"):
+        for pr in repo.get_pulls(state="all", sort="created", direction="desc"):
             if pr.created_at < cutoff_date:
                 break
             if pr.number != pr_number:
                 related_prs.append(str(pr.number))
+                if len(related_prs) == limit:  # Keep only the most recent
+                    break
         
-        return related_prs[:10]  # Limit to 10 most recent
+        return related_prs
     
     def get_related_issues(self, owner: str, name: str, pr_number: int) -> List[Issue]:
         """Get issues related to the PR"""
-        repo = self.github.get_repo(f"{owner}/{name}")
-        pr = repo.get_pull(pr_number)
+        bundle = self.get_pr_bundle(owner, name, pr_number)
+        if bundle is not None:
+            issues = self._get_issues_graphql(owner, name, pr_number, bundle["body"])
+            if issues is not None:
+                return issues
+        
+        repo = self._get_repo(owner, name)
+        pr = self._get_pr(owner, name, pr_number)
         
         issues = []
         
         # Get issues mentioned in PR description
         if pr.body:
-            import re
-            issue_refs = re.findall(r'#(\d+)', pr.body)
+            issue_refs = _ISSUE_REF_RE.findall(pr.body)
             for issue_num in issue_refs:
                 try:
                     issue_obj = repo.get_issue(int(issue_num))
@@ -141,10 +399,57 @@ class GitHubClient:
         
         return issues
     
+    def _get_issues_graphql(
+        self,
+        owner: str,
+        name: str,
+        pr_number: int,
+        body: Optional[str]
+    ) -> Optional[List[Issue]]:
+        """Fetch every issue referenced in body with one aliased GraphQL query"""
+        if not body:
+            return []
+        
+        issue_refs = _ISSUE_REF_RE.findall(body)
+        if not issue_refs:
+            return []
+        
+        numbers = sorted({int(issue_num) for issue_num in issue_refs})
+        fields = "\n".join(
+            f"i{number}: issueOrPullRequest(number: {number}) {{ ...IssueFields ...PullRequestFields }}"
+            for number in numbers
+        )
+        query = (
+            f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+            + ISSUE_FIELDS
+        )
+        data = self._graphql(query, {"owner": owner, "name": name})
+        if data is None or data.get("repository") is None:
+            return None
+        
+        issues = []
+        for issue_num in issue_refs:
+            # References that don't resolve (e.g. deleted issues) come back as null
+            node = data["repository"].get(f"i{int(issue_num)}")
+            if not node:
+                continue
+            issues.append(Issue(
+                id=str(node["number"]),
+                title=node["title"],
+                body=node["body"],
+                labels=[label["name"] for label in node["labels"]["nodes"]],
+                # REST reports merged PRs as closed
+                state="open" if node["state"] == "OPEN" else "closed",
+                created_at=_parse_datetime(node["createdAt"]),
+                closed_at=_parse_datetime(node["closedAt"]),
+                related_prs=[str(pr_number)]
+            ))
+        
+        return issues
+    
     def post_comment(self, owner: str, name: str, pr_number: int, comment: str):
         """Post a comment on a pull request"""
-        repo = self.github.get_repo(f"{owner}/{name}")
-        pr = repo.get_pull(pr_number)
+        pr = self._get_pr(owner, name, pr_number)
         return pr.create_issue_comment(comment)
     
     def post_review_comment(
@@ -158,8 +463,7 @@ class GitHubClient:
         line: int
     ):
         """Post a review comment on a specific line"""
-        repo = self.github.get_repo(f"{owner}/{name}")
-        pr = repo.get_pull(pr_number)
+        pr = self._get_pr(owner, name, pr_number)
         
         try:
             return pr.create_review_comment(
@@ -174,67 +478,67 @@ class GitHubClient:
     
     def _detect_language(self, filename: str) -> Optional[str]:
         """Detect programming language from filename"""
-        extension_map = {
-            # Python
-            ".py": "python",
-            ".pyi": "python",
-            ".pyx": "python",
-            # JavaScript/TypeScript
-            ".js": "javascript",
-            ".jsx": "jsx",
-            ".mjs": "javascript",
-            ".ts": "typescript",
-            ".tsx": "tsx",
-            # Java
-            ".java": "java",
-            ".kt": "kotlin",
-            ".scala": "scala",
-            # Go
-            ".go": "go",
-            # Rust
-            ".rs": "rust",
-            # C/C++
-            ".cpp": "cpp",
-            ".cc": "cpp",
-            ".cxx": "cpp",
-            ".c": "c",
-            ".h": "c",
-            ".hpp": "cpp",
-            # C#
-            ".cs": "csharp",
-            # Ruby
-            ".rb": "ruby",
-            ".rake": "ruby",
-            # PHP
-            ".php": "php",
-            ".phtml": "php",
-            # Other
-            ".sql": "sql",
-            ".html": "html",
-            ".htm": "html",
-            ".css": "css",
-            ".scss": "css",
-            ".sass": "css",
-            ".sh": "shell",
-            ".bash": "shell",
-            ".zsh": "shell",
-            ".yaml": "yaml",
-            ".yml": "yaml",
-            ".json": "json",
-            ".xml": "xml",
-            ".swift": "swift",
-            ".dart": "dart",
-            ".r": "r",
-            ".R": "r",
-            ".m": "objective-c",
-            ".mm": "objective-cpp",
-        }
-        
-        # Check exact extension match first
-        for ext, lang in extension_map.items():
-            if filename.endswith(ext):
-                return lang
-        
-        return None
+        i = filename.rfind(".")
+        return EXTENSION_MAP.get(filename[i + 1:].lower()) if i >= 0 else None
+
+
+class AsyncGitHubClient:
+    """
+    Async facade over GitHubClient.
+    PyGithub is blocking, so each call runs on a worker thread instead of
+    stalling the event loop.
+    """
+    
+    def __init__(self, client: GitHubClient):
+        self._sync = client
+    
+    async def _run(self, method: Callable, *args, **kwargs) -> Any:
+        """Run a blocking client method on the shared GitHub thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_EXECUTOR, partial(method, *args, **kwargs))
+    
+    async def get_repository(self, owner: str, name: str) -> Repository:
+        return await self._run(self._sync.get_repository, owner, name)
+    
+    async def get_pr_details(self, owner: str, name: str, pr_number: int) -> Dict:
+        return await self._run(self._sync.get_pr_details, owner, name, pr_number)
+    
+    async def get_pr_diff(self, owner: str, name: str, pr_number: int) -> List[FileDiff]:
+        return await self._run(self._sync.get_pr_diff, owner, name, pr_number)
+    
+    async def get_commits(self, owner: str, name: str, pr_number: int) -> List[Commit]:
+        return await self._run(self._sync.get_commits, owner, name, pr_number)
+    
+    async def get_related_prs(
+        self,
+        owner: str,
+        name: str,
+        pr_number: int,
+        days: int = 30,
+        limit: int = 10
+    ) -> List[str]:
+        return await self._run(self._sync.get_related_prs, owner, name, pr_number, days=days, limit=limit)
+    
+    async def get_related_issues(self, owner: str, name: str, pr_number: int) -> List[Issue]:
+        return await self._run(self._sync.get_related_issues, owner, name, pr_number)
+    
+    async def post_comment(self, owner: str, name: str, pr_number: int, comment: str):
+        return await self._run(self._sync.post_comment, owner, name, pr_number, comment)
+    
+    async def post_review_comment(
+        self,
+        owner: str,
+        name: str,
+        pr_number: int,
+        body: str,
+        commit_id: str,
+        path: str,
+        line: int
+    ):
+        return await self._run(
+            self._sync.post_review_comment,
+            owner, name, pr_number, body, commit_id, path, line
+        )
+
 
 
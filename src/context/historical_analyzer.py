@@ -1,12 +1,43 @@
 """Analyzes historical patterns from past PRs and issues"""
 
-from typing import List, Dict, Optional
+import hashlib
+import re
+import time
+from operator import itemgetter
+from typing import Any, List, Dict, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from ..models.review import CodeReviewRequest
 from ..models.analysis import AnalysisResult
 from ..utils.database import Neo4jConnection, QdrantConnection
 from ..utils.embeddings import CodeEmbedder
 from ..utils.code_parser import CodeParser
+from .github_client import AsyncGitHubClient, GitHubClient
+
+
+# Python import statements in a diff ("from pkg import x" / "import pkg")
+_IMPORT_RE = re.compile(r'from\s+(\S+)\s+import|import\s+(\S+)')
+
+
+# Closed PRs that touched the changed files (possible bug sources), and the
+# repository's most frequently modified files, in one round trip
+HISTORY_QUERY = """
+CALL {
+    MATCH (pr:PR)-[:MODIFIES]->(file:File)
+    WHERE file.path IN $file_paths
+    AND pr.state = 'closed'
+    RETURN DISTINCT 'bug' AS kind, pr.id AS id, pr.number AS number, pr.title AS title
+    LIMIT 5
+    UNION ALL
+    MATCH (pr:PR)-[:MODIFIES]->(file:File)
+    WHERE pr.repo_owner = $owner AND pr.repo_name = $repo
+    WITH file, count(pr) AS modification_count
+    WHERE modification_count > 3
+    RETURN 'refactor' AS kind, file.path AS id, modification_count AS number, '' AS title
+    ORDER BY number DESC
+    LIMIT 10
+}
+RETURN kind, id, number, title
+"""
 
 
 class HistoricalAnalyzer:
@@ -15,107 +46,188 @@ class HistoricalAnalyzer:
     Uses Neo4j for dependency tracking and Qdrant for code similarity search.
     """
     
+    # Seconds historical lookups are reused for; a review asks for the same
+    # PR's history several times and the embedding is expensive to recompute
+    CACHE_TTL = 600
+    # Seconds to skip a database after failing to connect to it
+    RECONNECT_INTERVAL = 60
+    
     def __init__(
         self,
-        github_client: Optional[object] = None,
+        github_client: Optional[Union[GitHubClient, AsyncGitHubClient]] = None,
         neo4j_conn: Optional[Neo4jConnection] = None,
         qdrant_conn: Optional[QdrantConnection] = None,
         embedder: Optional[CodeEmbedder] = None
     ):
+        # Calls are awaited, so a blocking client is wrapped in the async facade
+        if isinstance(github_client, GitHubClient):
+            github_client = AsyncGitHubClient(github_client)
         self.github_client = github_client
         self.neo4j = neo4j_conn or Neo4jConnection()
         self.qdrant = qdrant_conn or QdrantConnection()
         self.embedder = embedder or CodeEmbedder()
         self.code_parser = CodeParser()
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
         
-        # Try to connect to databases (non-blocking)
-        try:
-            self.neo4j.connect()
-        except Exception as e:
-            print(f"Warning: Neo4j connection failed: {e}")
+        # Databases are connected on first use; None until tried, then True
+        # or the time of the failed attempt
+        self._connected: Dict[str, Union[bool, float]] = {}
+    
+    def _ensure_connected(self, name: str, conn: Union[Neo4jConnection, QdrantConnection]) -> bool:
+        """Connect to a database on first use, backing off after a failure"""
+        state = self._connected.get(name)
+        if state is True:
+            return True
+        if state is not None and time.monotonic() - state < self.RECONNECT_INTERVAL:
+            return False
         
-        try:
-            self.qdrant.connect()
-        except Exception as e:
-            print(f"Warning: Qdrant connection failed: {e}")
+        if conn.connect():
+            self._connected[name] = True
+            return True
+        print(f"Warning: {name} unavailable, skipping it for {self.RECONNECT_INTERVAL}s")
+        self._connected[name] = time.monotonic()
+        return False
+    
+    def _neo4j_available(self) -> bool:
+        """Whether Neo4j is connected (connecting if needed)"""
+        return self._ensure_connected("Neo4j", self.neo4j)
+    
+    def _qdrant_available(self) -> bool:
+        """Whether Qdrant is connected (connecting if needed)"""
+        return self._ensure_connected("Qdrant", self.qdrant)
+    
+    def _cache_key(self, request: CodeReviewRequest) -> Tuple:
+        """Key identifying a PR at a specific revision of its diff"""
+        diff_hash = hashlib.blake2b(
+            b"".join(fd.diff.encode() for fd in request.diff),
+            digest_size=8
+        ).hexdigest()
+        return (request.repo.owner, request.repo.name, request.pr_number, diff_hash)
+    
+    def _cache_get(self, key: Tuple) -> Optional[Any]:
+        """Return the value cached under key, or None if missing or expired"""
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.CACHE_TTL:
+            return cached[1]
+        return None
+    
+    def _cache_set(self, key: Tuple, value: Any):
+        """Cache value under key, dropping expired entries so the cache stays bounded"""
+        now = time.monotonic()
+        self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self.CACHE_TTL}
+        self._cache[key] = (now, value)
     
     async def store_pr_data(self, request: CodeReviewRequest):
         """Store PR data in databases for future analysis"""
         pr_id = f"{request.repo.owner}/{request.repo.name}#{request.pr_number}"
         
         # Store in Neo4j
-        try:
-            self.neo4j.create_pr_node({
-                "id": pr_id,
-                "number": request.pr_number,
-                "title": request.title,
-                "author": request.author,
-                "repo_owner": request.repo.owner,
-                "repo_name": request.repo.name,
-                "created_at": request.created_at.isoformat() if request.created_at else None,
-                "updated_at": request.updated_at.isoformat() if request.updated_at else None,
-                "state": "open"
-            })
-            
-            # Store file dependencies
-            for file_diff in request.diff:
-                if file_diff.status != "removed":
-                    # Extract dependencies from code
-                    dependencies = self._extract_dependencies(file_diff)
-                    self.neo4j.create_file_dependency(
-                        pr_id,
-                        file_diff.file_path,
-                        dependencies
-                    )
-        except Exception as e:
-            print(f"Error storing PR in Neo4j: {e}")
+        if self._neo4j_available():
+            try:
+                self.neo4j.create_pr_node({
+                    "id": pr_id,
+                    "number": request.pr_number,
+                    "title": request.title,
+                    "author": request.author,
+                    "repo_owner": request.repo.owner,
+                    "repo_name": request.repo.name,
+                    "created_at": request.created_at.isoformat() if request.created_at else None,
+                    "updated_at": request.updated_at.isoformat() if request.updated_at else None,
+                    "state": "open"
+                })
+                
+                # Store file dependencies
+                for file_diff in request.diff:
+                    if file_diff.status != "removed":
+                        # Extract dependencies from code
+                        dependencies = self._extract_dependencies(file_diff)
+                        self.neo4j.create_file_dependency(
+                            pr_id,
+                            file_diff.file_path,
+                            dependencies
+                        )
+            except Exception as e:
+                print(f"Error storing PR in Neo4j: {e}")
         
         # Store embedding in Qdrant
-        try:
-            # Generate embedding for PR content
-            file_paths = [fd.file_path for fd in request.diff]
-            code_snippets = [fd.diff[:500] for fd in request.diff[:10]]  # Limit snippets
-            
+        if self._qdrant_available():
+            try:
+                # Generate embedding for PR content
+                file_paths, embedding = self._embed_pr(request)
+                
+                self.qdrant.store_pr_embedding(
+                    pr_id=pr_id,
+                    embedding=embedding.tolist(),
+                    metadata={
+                        "pr_number": request.pr_number,
+                        "title": request.title,
+                        "repo_owner": request.repo.owner,
+                        "repo_name": request.repo.name,
+                        "files": list(file_paths),
+                        "created_at": request.created_at.isoformat() if request.created_at else None,
+                        "author": request.author
+                    }
+                )
+            except Exception as e:
+                print(f"Error storing PR embedding in Qdrant: {e}")
+    
+    def _build_embed_inputs(self, request: CodeReviewRequest) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """File paths and code snippets describing a PR for embedding"""
+        file_paths = tuple(fd.file_path for fd in request.diff)
+        code_snippets = tuple(fd.diff[:500] for fd in request.diff[:10])  # Limit snippets
+        return file_paths, code_snippets
+    
+    def _embed_pr(self, request: CodeReviewRequest) -> Tuple[Tuple[str, ...], Any]:
+        """
+        Embed a PR's content, returning its file paths and the embedding.
+        
+        Storing a PR and searching for similar ones embed the same content, so
+        the embedding is cached by a hash of exactly what goes into it: an
+        edited title or description re-embeds, an unchanged PR does not.
+        """
+        file_paths, code_snippets = self._build_embed_inputs(request)
+        description = request.description or ""
+        content_hash = hashlib.blake2b(
+            b"\0".join([
+                request.title.encode(),
+                description.encode(),
+                *(path.encode() for path in file_paths),
+                *(snippet.encode() for snippet in code_snippets)
+            ]),
+            digest_size=16
+        ).hexdigest()
+        
+        key = ("embedding", content_hash)
+        embedding = self._cache_get(key)
+        if embedding is None:
             embedding = self.embedder.embed_pr_content(
                 title=request.title,
-                description=request.description or "",
+                description=description,
                 file_paths=file_paths,
                 code_snippets=code_snippets
             )
-            
-            self.qdrant.store_pr_embedding(
-                pr_id=pr_id,
-                embedding=embedding.tolist(),
-                metadata={
-                    "pr_number": request.pr_number,
-                    "title": request.title,
-                    "repo_owner": request.repo.owner,
-                    "repo_name": request.repo.name,
-                    "files": file_paths,
-                    "created_at": request.created_at.isoformat() if request.created_at else None,
-                    "author": request.author
-                }
-            )
-        except Exception as e:
-            print(f"Error storing PR embedding in Qdrant: {e}")
+            self._cache_set(key, embedding)
+        return file_paths, embedding
     
     def _extract_dependencies(self, file_diff) -> List[str]:
         """Extract file dependencies from code diff"""
-        dependencies = []
+        # Insertion-ordered set: repeated imports count once towards the limit
+        dependencies: Dict[str, None] = {}
         
-        # Simple heuristic: look for import statements
-        if file_diff.language == "python":
-            import re
-            imports = re.findall(r'from\s+(\S+)\s+import|import\s+(\S+)', file_diff.diff)
-            for match in imports:
-                module = match[0] or match[1]
+        # Simple heuristic: look for import statements (substring check first,
+        # most diffs have none)
+        if file_diff.language == "python" and "import" in file_diff.diff:
+            for match in _IMPORT_RE.finditer(file_diff.diff):
+                module = match.group(1) or match.group(2)
                 # Convert module to potential file path
-                if module and not module.startswith('.'):
-                    # Simple conversion (could be improved)
-                    file_path = module.replace('.', '/') + '.py'
-                    dependencies.append(file_path)
+                if not module or module.startswith('.'):
+                    continue
+                # Simple conversion (could be improved)
+                dependencies[module.replace('.', '/') + '.py'] = None
+                if len(dependencies) >= 10:  # Limit dependencies
+                    break
         
-        return dependencies[:10]  # Limit dependencies
+        return list(dependencies)
     
     async def find_similar_prs(
         self, 
@@ -123,65 +235,71 @@ class HistoricalAnalyzer:
         days: int = 30
     ) -> List[Dict]:
         """Find similar PRs from history using vector similarity and file overlap"""
+        key = ("similar_prs", days) + self._cache_key(request)
+        cached = self._cache_get(key)
+        if cached is None:
+            cached = await self._find_similar_prs(request, days)
+            self._cache_set(key, cached)
+        return list(cached)
+    
+    async def _find_similar_prs(self, request: CodeReviewRequest, days: int) -> List[Dict]:
+        """Uncached implementation of find_similar_prs"""
         similar_prs = []
         
         # Method 1: Vector similarity search using Qdrant
-        try:
-            # Generate embedding for current PR
-            file_paths = [fd.file_path for fd in request.diff]
-            code_snippets = [fd.diff[:500] for fd in request.diff[:10]]
-            
-            query_embedding = self.embedder.embed_pr_content(
-                title=request.title,
-                description=request.description or "",
-                file_paths=file_paths,
-                code_snippets=code_snippets
-            )
-            
-            # Search for similar PRs
-            qdrant_results = self.qdrant.search_similar_prs(
-                query_embedding=query_embedding.tolist(),
-                limit=10,
-                score_threshold=0.6
-            )
-            
-            for result in qdrant_results:
-                # Filter by repository if needed
-                if result.get("repo_owner") == request.repo.owner and \
-                   result.get("repo_name") == request.repo.name:
-                    similar_prs.append({
-                        "pr_number": result["pr_number"],
-                        "similarity_score": result["similarity_score"],
-                        "reason": "Code similarity",
-                        "method": "vector_search"
-                    })
-        except Exception as e:
-            print(f"Error in Qdrant similarity search: {e}")
+        if self._qdrant_available():
+            try:
+                # Generate embedding for current PR (shared with store_pr_data)
+                _, query_embedding = self._embed_pr(request)
+                
+                # Search for similar PRs in the same repository
+                qdrant_results = self.qdrant.search_similar_prs(
+                    query_embedding=query_embedding.tolist(),
+                    limit=5,
+                    score_threshold=0.6,
+                    payload_filter={
+                        "repo_owner": request.repo.owner,
+                        "repo_name": request.repo.name
+                    }
+                )
+                
+                for result in qdrant_results:
+                    # The PR itself was stored before the search
+                    if result["pr_number"] != request.pr_number:
+                        similar_prs.append({
+                            "pr_number": result["pr_number"],
+                            "similarity_score": result["similarity_score"],
+                            "reason": "Code similarity",
+                            "method": "vector_search"
+                        })
+            except Exception as e:
+                print(f"Error in Qdrant similarity search: {e}")
         
         # Method 2: File-based similarity using Neo4j
-        try:
-            file_paths = [fd.file_path for fd in request.diff if fd.status != "removed"]
-            if file_paths:
-                neo4j_results = self.neo4j.find_related_prs_by_files(file_paths, limit=10)
-                
-                for result in neo4j_results:
-                    pr_id = result.get("pr_id", "")
-                    if pr_id and f"{request.repo.owner}/{request.repo.name}#" in pr_id:
-                        pr_number = result.get("pr_number")
-                        if pr_number and pr_number != request.pr_number:
-                            similar_prs.append({
-                                "pr_number": str(pr_number),
-                                "similarity_score": result.get("common_files", 0) / len(file_paths),
-                                "reason": f"Modified {result.get('common_files', 0)} common files",
-                                "method": "file_overlap"
-                            })
-        except Exception as e:
-            print(f"Error in Neo4j file similarity search: {e}")
+        if self._neo4j_available():
+            try:
+                file_paths = [fd.file_path for fd in request.diff if fd.status != "removed"]
+                if file_paths:
+                    neo4j_results = self.neo4j.find_related_prs_by_files(file_paths, limit=10)
+                    
+                    for result in neo4j_results:
+                        pr_id = result.get("pr_id", "")
+                        if pr_id and f"{request.repo.owner}/{request.repo.name}#" in pr_id:
+                            pr_number = result.get("pr_number")
+                            if pr_number and pr_number != request.pr_number:
+                                similar_prs.append({
+                                    "pr_number": str(pr_number),
+                                    "similarity_score": result.get("common_files", 0) / len(file_paths),
+                                    "reason": f"Modified {result.get('common_files', 0)} common files",
+                                    "method": "file_overlap"
+                                })
+            except Exception as e:
+                print(f"Error in Neo4j file similarity search: {e}")
         
         # Fallback: Use GitHub API if databases unavailable
         if not similar_prs and self.github_client:
             try:
-                related_prs = self.github_client.get_related_prs(
+                related_prs = await self.github_client.get_related_prs(
                     request.repo.owner,
                     request.repo.name,
                     request.pr_number,
@@ -198,22 +316,29 @@ class HistoricalAnalyzer:
             except Exception as e:
                 print(f"Error in GitHub API fallback: {e}")
         
-        # Deduplicate and sort by similarity score
-        seen = set()
-        unique_prs = []
+        # Deduplicate, keeping the best scoring record for each PR (sources
+        # report numbers as int or str)
+        best = {}
         for pr in similar_prs:
-            key = pr["pr_number"]
-            if key not in seen:
-                seen.add(key)
-                unique_prs.append(pr)
+            key = str(pr["pr_number"])
+            current = best.get(key)
+            if current is None or pr["similarity_score"] > current["similarity_score"]:
+                best[key] = pr
         
         # Sort by similarity score descending
-        unique_prs.sort(key=lambda x: x["similarity_score"], reverse=True)
-        
-        return unique_prs[:10]  # Return top 10
+        return sorted(best.values(), key=itemgetter("similarity_score"), reverse=True)[:10]  # Return top 10
     
     async def find_bug_patterns(self, request: CodeReviewRequest) -> List[Dict]:
         """Find bug patterns from historical issues and PRs"""
+        key = ("bug_patterns",) + self._cache_key(request)
+        cached = self._cache_get(key)
+        if cached is None:
+            cached = await self._find_bug_patterns(request)
+            self._cache_set(key, cached)
+        return list(cached)
+    
+    async def _find_bug_patterns(self, request: CodeReviewRequest) -> List[Dict]:
+        """Uncached implementation of find_bug_patterns"""
         bug_patterns = []
         
         # Check related issues for bug patterns
@@ -228,62 +353,73 @@ class HistoricalAnalyzer:
                 })
         
         # Search Neo4j for PRs that caused bugs (if we track this)
+        for result in self._neo4j_history(request)["bug"]:
+            bug_patterns.append({
+                "pr_id": result["id"],
+                "pr_number": result["number"],
+                "title": result["title"] or "Unknown",
+                "pattern": "historical_bug",
+                "relevance": 0.6,
+                "source": "neo4j"
+            })
+        
+        return bug_patterns
+    
+    def _neo4j_history(self, request: CodeReviewRequest) -> Dict[str, List[Dict]]:
+        """
+        Query Neo4j for the history used by bug and team patterns.
+        
+        Both lookups run as one query (a single round trip), and the result
+        is cached per PR revision for whichever of the two asks second.
+        Rows are grouped by kind: "bug" (closed PRs that touched the changed
+        files) and "refactor" (frequently modified files in the repository).
+        """
+        key = ("neo4j_history",) + self._cache_key(request)
+        history = self._cache_get(key)
+        if history is not None:
+            return history
+        
+        history = {"bug": [], "refactor": []}
+        if not self._neo4j_available():
+            return history
+        
         try:
-            # Look for PRs that were later associated with bug fixes
-            query = """
-            MATCH (pr:PR)-[:MODIFIES]->(file:File)
-            WHERE file.path IN $file_paths
-            AND pr.state = 'closed'
-            RETURN DISTINCT pr.id AS pr_id, pr.title AS title, pr.number AS pr_number
-            LIMIT 5
-            """
-            file_paths = [fd.file_path for fd in request.diff]
-            if file_paths:
-                results = self.neo4j.execute_query(query, {"file_paths": file_paths})
-                for result in results:
-                    bug_patterns.append({
-                        "pr_id": result.get("pr_id"),
-                        "pr_number": result.get("pr_number"),
-                        "title": result.get("title", "Unknown"),
-                        "pattern": "historical_bug",
-                        "relevance": 0.6,
-                        "source": "neo4j"
-                    })
+            results = self.neo4j.execute_query(HISTORY_QUERY, {
+                "file_paths": [fd.file_path for fd in request.diff],
+                "owner": request.repo.owner,
+                "repo": request.repo.name
+            })
+            for result in results:
+                history[result["kind"]].append(result)
         except Exception as e:
-            print(f"Error searching for bug patterns in Neo4j: {e}")
+            print(f"Error querying history in Neo4j: {e}")
+            return history
         
-        return bug_patterns
+        self._cache_set(key, history)
+        return history
     
     async def get_team_patterns(self, request: CodeReviewRequest) -> Dict:
         """Get team-specific patterns from historical data"""
+        # Team patterns depend only on the repository, not on this PR
+        key = ("team_patterns", request.repo.owner, request.repo.name)
+        cached = self._cache_get(key)
+        if cached is None:
+            cached = await self._get_team_patterns(request)
+            self._cache_set(key, cached)
+        return {name: list(values) for name, values in cached.items()}
+    
+    async def _get_team_patterns(self, request: CodeReviewRequest) -> Dict:
+        """Uncached implementation of get_team_patterns"""
         patterns = {
             "preferred_patterns": [],
             "anti_patterns": [],
             "recent_refactors": []
         }
         
-        # Query Neo4j for team patterns
-        try:
-            # Find frequently modified files (potential refactoring areas)
-            query = """
-            MATCH (pr:PR)-[:MODIFIES]->(file:File)
-            WHERE pr.repo_owner = $owner AND pr.repo_name = $repo
-            WITH file, count(pr) AS modification_count
-            WHERE modification_count > 3
-            RETURN file.path AS file_path, modification_count
-            ORDER BY modification_count DESC
-            LIMIT 10
-            """
-            results = self.neo4j.execute_query(query, {
-                "owner": request.repo.owner,
-                "repo": request.repo.name
-            })
-            
-            patterns["recent_refactors"] = [
-                result["file_path"] for result in results
-            ]
-        except Exception as e:
-            print(f"Error querying team patterns: {e}")
+        # Find frequently modified files (potential refactoring areas)
+        patterns["recent_refactors"] = [
+            result["id"] for result in self._neo4j_history(request)["refactor"]
+        ]
         
         return patterns
     
@@ -293,33 +429,31 @@ class HistoricalAnalyzer:
         historical_data: Dict
     ) -> List[AnalysisResult]:
         """Enhance analysis results with historical evidence"""
+        # The evidence is the same for every result, so format it once
+        similar_evidence = [
+            f"Similar pattern in PR #{pr['pr_number']} "
+            f"(similarity: {pr.get('similarity_score', 0):.2f}, method: {pr.get('method', 'unknown')})"
+            for pr in (historical_data.get("similar_prs") or [])[:3]
+        ]
+        
+        bug_evidence = []
+        for bug in (historical_data.get("bug_patterns") or [])[:2]:
+            if bug.get("source") == "related_issue":
+                bug_evidence.append(
+                    f"Related to issue #{bug['issue_id']}: {bug['title']}"
+                )
+            elif bug.get("source") == "neo4j":
+                bug_evidence.append(
+                    f"Similar files modified in PR #{bug.get('pr_number', 'unknown')}: {bug['title']}"
+                )
+        
+        evidence = similar_evidence + bug_evidence
         enhanced_results = []
         
         for result in results:
             # Add historical evidence if available
-            if historical_data.get("similar_prs"):
-                evidence_items = []
-                for pr in historical_data["similar_prs"][:3]:
-                    score = pr.get("similarity_score", 0)
-                    method = pr.get("method", "unknown")
-                    evidence_items.append(
-                        f"Similar pattern in PR #{pr['pr_number']} "
-                        f"(similarity: {score:.2f}, method: {method})"
-                    )
-                result.evidence.extend(evidence_items)
-            
-            if historical_data.get("bug_patterns"):
-                evidence_items = []
-                for bug in historical_data["bug_patterns"][:2]:
-                    if bug.get("source") == "related_issue":
-                        evidence_items.append(
-                            f"Related to issue #{bug['issue_id']}: {bug['title']}"
-                        )
-                    elif bug.get("source") == "neo4j":
-                        evidence_items.append(
-                            f"Similar files modified in PR #{bug.get('pr_number', 'unknown')}: {bug['title']}"
-                        )
-                result.evidence.extend(evidence_items)
+            if evidence:
+                result.evidence.extend(evidence)
             
             enhanced_results.append(result)
         
@@ -0,0 +1,62 @@
+"""Concurrent fetching of pull request context"""
+
+import asyncio
+from typing import Any, Dict, Union
+from .github_client import AsyncGitHubClient, GitHubClient
+
+
+# Context that a review can do without; failures here degrade to empty lists
+OPTIONAL_CONTEXT = ("commits", "issues", "related_prs")
+
+
+async def gather_pr_context(
+    client: Union[GitHubClient, AsyncGitHubClient],
+    owner: str,
+    name: str,
+    pr_number: int
+) -> Dict[str, Any]:
+    """
+    Fetch everything needed to review a pull request concurrently.
+    
+    The GitHub client is blocking, so each call runs on the GitHub worker
+    threads (which also bound the calls in flight); wall-clock time is
+    roughly that of the slowest call instead of the sum.
+    
+    Args:
+        client: GitHub client to fetch with
+        owner: Repository owner
+        name: Repository name
+        pr_number: Pull request number
+    
+    Returns:
+        Dict with repo, pr_details, diffs, commits, issues and related_prs
+    """
+    if isinstance(client, GitHubClient):
+        client = AsyncGitHubClient(client)
+    
+    calls = {
+        "repo": client.get_repository(owner, name),
+        "pr_details": client.get_pr_details(owner, name, pr_number),
+        "diffs": client.get_pr_diff(owner, name, pr_number),
+        "commits": client.get_commits(owner, name, pr_number),
+        "issues": client.get_related_issues(owner, name, pr_number),
+        "related_prs": client.get_related_prs(owner, name, pr_number),
+    }
+    results = await asyncio.gather(*calls.values(), return_exceptions=True)
+    
+    context = {}
+    for key, result in zip(calls, results):
+        if isinstance(result, Exception):
+            if key not in OPTIONAL_CONTEXT:
+                raise result
+            print(f"Error fetching {key} for {owner}/{name}#{pr_number}: {result}")
+            result = []
+        elif isinstance(result, BaseException):
+            # Cancellation and the like always propagate
+            raise result
+        context[key] = result
+    
+    return context
+
+
+
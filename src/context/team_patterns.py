@@ -1,7 +1,8 @@
 """Loads and manages team-specific coding patterns"""
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
+import os
 from pathlib import Path
 from ..models.review import TeamContext
 
@@ -9,6 +10,10 @@ from ..models.review import TeamContext
 class TeamPatternsLoader:
     """Loads team-specific patterns and conventions"""
     
+    # Parsed config files shared by all loaders, keyed by (path, mtime) so an
+    # edited file is re-read. Treated as read-only; add_pattern copies on write
+    _cache: Dict[Tuple[str, int], Dict] = {}
+    
     def __init__(self, config_path: Optional[str] = None):
         self.config_path = config_path or "team_patterns.json"
         self.patterns: Dict = {}
@@ -17,9 +22,17 @@ class TeamPatternsLoader:
     def _load_patterns(self):
         """Load patterns from config file"""
         try:
-            if Path(self.config_path).exists():
+            path = Path(self.config_path)
+            if path.exists():
+                key = (self.config_path, path.stat().st_mtime_ns)
+                cached = TeamPatternsLoader._cache.get(key)
+                if cached is not None:
+                    self.patterns = cached
+                    return
+                
                 with open(self.config_path, 'r') as f:
                     self.patterns = json.load(f)
+                TeamPatternsLoader._cache[key] = self.patterns
         except Exception:
             # Use default patterns if file doesn't exist
             self.patterns = self._default_patterns()
@@ -63,20 +76,29 @@ class TeamPatternsLoader:
     
     def add_pattern(self, pattern: str, pattern_type: str = "known_patterns"):
         """Add a new pattern"""
-        if pattern_type not in self.patterns:
-            self.patterns[pattern_type] = []
+        existing = self.patterns.get(pattern_type, [])
         
-        if pattern not in self.patterns[pattern_type]:
-            self.patterns[pattern_type].append(pattern)
+        if pattern not in existing:
+            # Copy rather than mutate: self.patterns may be shared via the cache
+            self.patterns = {**self.patterns, pattern_type: existing + [pattern]}
             self._save_patterns()
     
     def _save_patterns(self):
         """Save patterns to config file"""
         try:
-            with open(self.config_path, 'w') as f:
+            # Write a temporary file and swap it in, so concurrent loaders never
+            # read a half-written config
+            tmp_path = self.config_path + ".tmp"
+            with open(tmp_path, 'w') as f:
                 json.dump(self.patterns, f, indent=2)
+            os.replace(tmp_path, self.config_path)
         except Exception:
             pass
+        finally:
+            TeamPatternsLoader._cache = {
+                key: value for key, value in TeamPatternsLoader._cache.items()
+                if key[0] != self.config_path
+            }
 
 
 
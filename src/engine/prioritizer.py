@@ -1,8 +1,55 @@
 """Prioritizes and deduplicates analysis results"""
 
-from typing import List, Dict
+import heapq
+import re
+from functools import lru_cache
+from typing import List, Dict, Optional
+import numpy as np
 from ..models.analysis import AnalysisResult, PriorityLevel, AnalysisCategory
 
+try:
+    import ahocorasick
+except ImportError:  # Optional: fall back to plain substring checks
+    ahocorasick = None
+
+
+# Path fragments marking security- or money-sensitive files
+CRITICAL_KEYWORDS = (
+    "auth", "payment", "security", "encrypt", "secret",
+    "admin", "permission", "access"
+)
+
+
+def _build_critical_automaton():
+    """Compile CRITICAL_KEYWORDS into an Aho-Corasick automaton (None if unavailable)"""
+    if ahocorasick is None:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for keyword in CRITICAL_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_CRITICAL_AUTOMATON = _build_critical_automaton()
+
+# Fallback when pyahocorasick is missing: one regex scan instead of a
+# substring check per keyword. Matched against the lowercased path, which
+# is cheaper than re.IGNORECASE
+_CRITICAL_RE = re.compile("|".join(map(re.escape, CRITICAL_KEYWORDS)))
+
+
+@lru_cache(maxsize=1024)
+def _is_critical_path(file_path: str) -> bool:
+    """Check a path for critical keywords, memoized since results share files"""
+    file_path = file_path.lower()
+    if _CRITICAL_AUTOMATON is None:
+        return _CRITICAL_RE.search(file_path) is not None
+    
+    # Single pass over the path for all keywords
+    return next(_CRITICAL_AUTOMATON.iter(file_path), None) is not None
+
 
 class Prioritizer:
     """
@@ -34,76 +81,77 @@ class Prioritizer:
         PriorityLevel.INFO: 1.0,
     }
     
-    def prioritize(self, results: List[AnalysisResult]) -> List[AnalysisResult]:
+    def __init__(self):
+        # Weights as arrays indexed by enum position, for scoring all results
+        # in a few vectorized operations
+        self._category_index = {category: i for i, category in enumerate(AnalysisCategory)}
+        self._priority_index = {priority: i for i, priority in enumerate(PriorityLevel)}
+        self._category_weights = np.array([self.CATEGORY_WEIGHTS.get(c, 1.0) for c in AnalysisCategory])
+        self._priority_weights = np.array([self.PRIORITY_WEIGHTS.get(p, 1.0) for p in PriorityLevel])
+    
+    def prioritize(self, results: List[AnalysisResult], limit: Optional[int] = None) -> List[AnalysisResult]:
         """
         Prioritize and deduplicate results.
         
         Args:
             results: List of analysis results
+            limit: Maximum number of results to return (all if None)
             
         Returns:
             Prioritized and deduplicated results
         """
-        # Calculate priority scores
-        scored_results = []
-        for result in results:
-            score = self._calculate_score(result)
-            scored_results.append((score, result))
-        
-        # Sort by score (descending)
-        scored_results.sort(key=lambda x: x[0], reverse=True)
+        # Score and deduplicate in one pass, keeping the highest scoring result
+        # per signature (the earliest one on ties)
+        scores = self._calculate_scores(results).tolist()
+        best = {}
+        for index, result in enumerate(results):
+            entry = (-scores[index], index, result)
+            signature = self._signature(result)
+            current = best.get(signature)
+            if current is None or entry[0] < current[0]:
+                best[signature] = entry
         
-        # Deduplicate similar results
-        deduplicated = self._deduplicate([r for _, r in scored_results])
-        
-        return deduplicated
+        # Sort by score (descending), then input order; indexes are unique, so
+        # results themselves are never compared. With a limit, select the top
+        # entries with a heap instead of sorting them all
+        if limit is None:
+            ranked = sorted(best.values())
+        else:
+            ranked = heapq.nsmallest(limit, best.values())
+        return [result for _, _, result in ranked]
     
-    def _calculate_score(self, result: AnalysisResult) -> float:
-        """Calculate priority score for a result"""
-        category_weight = self.CATEGORY_WEIGHTS.get(result.category, 1.0)
-        priority_weight = self.PRIORITY_WEIGHTS.get(result.priority, 1.0)
-        confidence_weight = result.confidence
+    def _calculate_scores(self, results: List[AnalysisResult]) -> np.ndarray:
+        """Calculate priority scores for all results at once"""
+        count = len(results)
+        categories = np.fromiter((self._category_index[r.category] for r in results), np.intp, count)
+        priorities = np.fromiter((self._priority_index[r.priority] for r in results), np.intp, count)
+        confidences = np.fromiter((r.confidence for r in results), np.float64, count)
+        critical = np.fromiter((self._is_critical_file(r.location.file_path) for r in results), bool, count)
         
-        # Base score
-        base_score = category_weight * priority_weight * confidence_weight
+        # Base score: category weight * priority weight * confidence
+        scores = self._category_weights[categories] * self._priority_weights[priorities] * confidences
         
         # Boost for critical files
-        if self._is_critical_file(result.location.file_path):
-            base_score *= 1.5
+        scores[critical] *= 1.5
         
         # Boost for security issues
-        if result.category == AnalysisCategory.SECURITY:
-            base_score *= 1.2
+        scores[categories == self._category_index[AnalysisCategory.SECURITY]] *= 1.2
         
-        return base_score
+        return scores
     
     def _is_critical_file(self, file_path: str) -> bool:
         """Check if file is critical (auth, payment, etc.)"""
-        critical_keywords = [
-            "auth", "payment", "security", "encrypt", "secret",
-            "admin", "permission", "access"
-        ]
-        return any(keyword in file_path.lower() for keyword in critical_keywords)
+        return _is_critical_path(file_path)
     
-    def _deduplicate(self, results: List[AnalysisResult]) -> List[AnalysisResult]:
-        """Remove duplicate or very similar results"""
-        seen = set()
-        deduplicated = []
-        
-        for result in results:
-            # Create a signature for the result
-            signature = (
-                result.location.file_path,
-                result.location.line_start,
-                result.category,
-                result.title[:50]  # First 50 chars of title
-            )
-            
-            if signature not in seen:
-                seen.add(signature)
-                deduplicated.append(result)
-        
-        return deduplicated
+    def _signature(self, result: AnalysisResult) -> tuple:
+        """Signature under which duplicate or very similar results collapse"""
+        title = result.title
+        return (
+            result.location.file_path,
+            result.location.line_start,
+            result.category,
+            title if len(title) <= 50 else title[:50]  # First 50 chars of title
+        )
 
 
 
@@ -1,5 +1,7 @@
 """Main review orchestration engine"""
 
+import asyncio
+from bisect import bisect_right
 from typing import List, Optional
 from ..models.review import CodeReviewRequest
 from ..models.analysis import AnalysisResult
@@ -10,13 +12,20 @@ from ..analyzers import (
     PerformancePredictor,
     TestGapAnalyzer,
 )
+from ..analyzers.base import shared_diff_cache
 from ..context import HistoricalAnalyzer, TeamPatternsLoader
 from ..utils.database import Neo4jConnection, QdrantConnection
 from ..utils.embeddings import CodeEmbedder
+from ..utils.result_ids import ensure_result_id
 from ..learning.feedback_analyzer import FeedbackAnalyzer
 from .prioritizer import Prioritizer
 
 
+# Lower bounds of each confidence level above VERY_LOW, and the levels by name
+CONFIDENCE_THRESHOLDS = (0.3, 0.5, 0.7, 0.9)
+CONFIDENCE_LEVEL_NAMES = ("VERY_LOW", "LOW", "MEDIUM", "HIGH", "VERY_HIGH")
+
+
 class ReviewEngine:
     """
     Main orchestration engine for code review.
@@ -83,14 +92,19 @@ class ReviewEngine:
         # Run all analyzers in parallel
         all_results = []
         
-        for analyzer in self.analyzers:
-            try:
-                results = await analyzer.analyze(request)
-                all_results.extend(results)
-            except Exception as e:
+        with shared_diff_cache():
+            outcomes = await asyncio.gather(
+                *(analyzer.analyze(request) for analyzer in self.analyzers),
+                return_exceptions=True
+            )
+        for analyzer, outcome in zip(self.analyzers, outcomes):
+            if isinstance(outcome, Exception):
                 # Log error but continue with other analyzers
-                print(f"Error in {analyzer.name}: {e}")
+                print(f"Error in {analyzer.name}: {outcome}")
                 continue
+            if isinstance(outcome, BaseException):
+                raise outcome
+            all_results.extend(outcome)
         
         # Enhance with historical context
         if self.enable_historical:
@@ -110,30 +124,34 @@ class ReviewEngine:
             if r.confidence >= self.min_confidence
         ]
         
-        # Prioritize and deduplicate
-        prioritized_results = self.prioritizer.prioritize(filtered_results)
+        # Prioritize, deduplicate and limit results
+        final_results = self.prioritizer.prioritize(filtered_results, limit=self.max_results)
         
-        # Limit results
-        return prioritized_results[:self.max_results]
+        # Give each result an ID for feedback tracking
+        for result in final_results:
+            ensure_result_id(result)
+        
+        return final_results
     
     async def _gather_historical_context(self, request: CodeReviewRequest) -> dict:
         """Gather historical context for the review"""
         historical_data = {}
         
-        try:
-            # Find similar PRs
-            similar_prs = await self.historical_analyzer.find_similar_prs(request)
-            historical_data["similar_prs"] = similar_prs
-            
-            # Find bug patterns
-            bug_patterns = await self.historical_analyzer.find_bug_patterns(request)
-            historical_data["bug_patterns"] = bug_patterns
-            
-            # Get team patterns
-            team_patterns = await self.historical_analyzer.get_team_patterns(request)
-            historical_data["team_patterns"] = team_patterns
-        except Exception as e:
-            print(f"Error gathering historical context: {e}")
+        # The three lookups are independent, so run them concurrently
+        lookups = {
+            "similar_prs": self.historical_analyzer.find_similar_prs(request),
+            "bug_patterns": self.historical_analyzer.find_bug_patterns(request),
+            "team_patterns": self.historical_analyzer.get_team_patterns(request),
+        }
+        outcomes = await asyncio.gather(*lookups.values(), return_exceptions=True)
+        
+        for key, outcome in zip(lookups, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error gathering historical context ({key}): {outcome}")
+                continue
+            if isinstance(outcome, BaseException):
+                raise outcome
+            historical_data[key] = outcome
         
         return historical_data
     
@@ -142,39 +160,28 @@ class ReviewEngine:
         if not self.feedback_analyzer:
             return results
         
+        # Generate analysis result IDs if not present
+        for result in results:
+            ensure_result_id(result)
+        
+        # Adjust confidence based on feedback, fetched for all results at once
+        try:
+            adjusted_confidences = await self.feedback_analyzer.adjust_confidence_batch(results)
+        except Exception as e:
+            print(f"Error applying learning to results: {e}")
+            return results  # Keep originals if error
+        
         adjusted_results = []
         
-        for result in results:
-            try:
-                # Generate analysis result ID if not present
-                if "analysis_result_id" not in result.metadata:
-                    result.metadata["analysis_result_id"] = (
-                        f"{result.category.value}_{result.location.file_path}_"
-                        f"{result.location.line_start}_{hash(result.title)}"
-                    )
-                
-                # Adjust confidence based on feedback
-                adjusted_confidence = await self.feedback_analyzer.adjust_confidence(result)
-                
-                # Update confidence if adjusted
-                if adjusted_confidence != result.confidence:
-                    result.confidence = adjusted_confidence
-                    # Update confidence level
-                    if result.confidence >= 0.9:
-                        result.confidence_level = result.confidence_level.__class__.VERY_HIGH
-                    elif result.confidence >= 0.7:
-                        result.confidence_level = result.confidence_level.__class__.HIGH
-                    elif result.confidence >= 0.5:
-                        result.confidence_level = result.confidence_level.__class__.MEDIUM
-                    elif result.confidence >= 0.3:
-                        result.confidence_level = result.confidence_level.__class__.LOW
-                    else:
-                        result.confidence_level = result.confidence_level.__class__.VERY_LOW
-                
-                adjusted_results.append(result)
-            except Exception as e:
-                print(f"Error applying learning to result: {e}")
-                adjusted_results.append(result)  # Keep original if error
+        for result, adjusted_confidence in zip(results, adjusted_confidences):
+            # Update confidence if adjusted
+            if adjusted_confidence != result.confidence:
+                result.confidence = adjusted_confidence
+                # Update confidence level
+                level = CONFIDENCE_LEVEL_NAMES[bisect_right(CONFIDENCE_THRESHOLDS, result.confidence)]
+                result.confidence_level = type(result.confidence_level)[level]
+            
+            adjusted_results.append(result)
         
         return adjusted_results
 
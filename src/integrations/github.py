@@ -1,18 +1,41 @@
 """GitHub integration module"""
 
+import asyncio
 from typing import Dict, Optional
 from typing import List
 from datetime import datetime
-from ..context.github_client import GitHubClient
+from ..context.github_client import AsyncGitHubClient, GitHubClient
+from ..context.parallel import gather_pr_context
 from ..models.review import CodeReviewRequest
-from ..models.analysis import AnalysisResult
+from ..models.analysis import AnalysisResult, PriorityLevel
+from ..utils.result_ids import ensure_result_id
 
 
 class GitHubIntegration:
     """Handles GitHub-specific integrations"""
     
+    # Comment decorations, built once rather than per comment
+    CATEGORY_EMOJI = {
+        "security": "🔒",
+        "bug": "🐛",
+        "performance": "⚡",
+        "architecture": "🏗️",
+        "test": "🧪",
+        "code_quality": "✨",
+        "style": "💅",
+        "business_logic": "💼",
+    }
+    DEFAULT_EMOJI = "💡"
+    PRIORITY_BADGES = {
+        priority: f"**[{priority.value.upper()}]**"
+        for priority in PriorityLevel
+        if priority.value != "info"
+    }
+    
     def __init__(self, token: str):
         self.client = GitHubClient(token)
+        # Blocking calls from async code go through the facade's worker threads
+        self.async_client = AsyncGitHubClient(self.client)
     
     async def create_review_request(
         self, 
@@ -31,23 +54,9 @@ class GitHubIntegration:
         Returns:
             CodeReviewRequest object
         """
-        # Get repository info
-        repo = self.client.get_repository(owner, repo_name)
-        
-        # Get PR details
-        pr_details = self.client.get_pr_details(owner, repo_name, pr_number)
-        
-        # Get file diffs
-        diffs = self.client.get_pr_diff(owner, repo_name, pr_number)
-        
-        # Get commits
-        commits = self.client.get_commits(owner, repo_name, pr_number)
-        
-        # Get related issues
-        issues = self.client.get_related_issues(owner, repo_name, pr_number)
-        
-        # Get related PRs
-        related_prs = self.client.get_related_prs(owner, repo_name, pr_number)
+        # The fetches are independent, so run them concurrently
+        context = await gather_pr_context(self.async_client, owner, repo_name, pr_number)
+        pr_details = context["pr_details"]
         
         # Create request
         request = CodeReviewRequest(
@@ -55,14 +64,14 @@ class GitHubIntegration:
             pr_number=pr_details["number"],
             title=pr_details["title"],
             description=pr_details["description"],
-            repo=repo,
+            repo=context["repo"],
             base_branch=pr_details["base_branch"],
             head_branch=pr_details["head_branch"],
             author=pr_details["author"],
-            diff=diffs,
-            commit_history=commits,
-            related_issues=issues,
-            related_prs=related_prs,
+            diff=context["diffs"],
+            commit_history=context["commits"],
+            related_issues=context["issues"],
+            related_prs=context["related_prs"],
             labels=pr_details["labels"],
             created_at=pr_details["created_at"],
             updated_at=pr_details["updated_at"]
@@ -76,7 +85,8 @@ class GitHubIntegration:
         repo_name: str,
         pr_number: int,
         results: List[AnalysisResult],
-        max_comments: int = 50
+        max_comments: int = 50,
+        request: Optional[CodeReviewRequest] = None
     ) -> int:
         """
         Post analysis results as GitHub review comments.
@@ -87,107 +97,108 @@ class GitHubIntegration:
             pr_number: Pull request number
             results: List of AnalysisResult objects
             max_comments: Maximum number of comments to post
+            request: The reviewed request, whose commit history is reused
+                instead of fetching the PR's commits again
             
         Returns:
             Number of comments posted
         """
-        posted_count = 0
-        
         # Get PR commits for review comments
-        commits = self.client.get_commits(owner, repo_name, pr_number)
+        commits = request.commit_history if request is not None else None
+        if not commits:
+            commits = await self.async_client.get_commits(owner, repo_name, pr_number)
         if not commits:
             return 0
         
-        latest_commit_sha = commits[0].sha if commits else None
-        
-        # Post comments (limit to max_comments)
-        for result in results[:max_comments]:
-            try:
-                comment_body = self._format_comment(result)
-                
-                # Generate analysis result ID for tracking
-                analysis_result_id = result.metadata.get(
-                    "analysis_result_id",
-                    f"{result.category.value}_{result.location.file_path}_{result.location.line_start}_{hash(result.title)}"
-                )
-                result.metadata["analysis_result_id"] = analysis_result_id
-                
-                # Try to post as review comment
-                if latest_commit_sha:
-                    comment = self.client.post_review_comment(
-                        owner=owner,
-                        name=repo_name,
-                        pr_number=pr_number,
-                        body=comment_body,
-                        commit_id=latest_commit_sha,
-                        path=result.location.file_path,
-                        line=result.location.line_start
-                    )
-                else:
-                    # Fallback to regular comment
-                    comment = self.client.post_comment(
-                        owner=owner,
-                        name=repo_name,
-                        pr_number=pr_number,
-                        comment=comment_body
-                    )
-                
-                # Store comment ID -> analysis result ID mapping for feedback tracking
-                # (In production, store this in Redis or database)
-                if hasattr(comment, 'id'):
-                    result.metadata["comment_id"] = comment.id
-                
-                posted_count += 1
-            except Exception as e:
-                print(f"Error posting comment: {e}")
+        # Commits are listed oldest first; comments anchor to the PR head
+        latest_commit_sha = commits[-1].sha
+        
+        # Post comments concurrently (limit to max_comments); the GitHub worker
+        # threads bound the requests in flight
+        outcomes = await asyncio.gather(*(
+            self._post_result_comment(owner, repo_name, pr_number, result, latest_commit_sha)
+            for result in results[:max_comments]
+        ), return_exceptions=True)
+        
+        posted = 0
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                print(f"Error posting comment: {outcome}")
                 continue
+            if isinstance(outcome, BaseException):
+                raise outcome
+            posted += 1
         
-        return posted_count
+        return posted
+    
+    async def _post_result_comment(
+        self,
+        owner: str,
+        repo_name: str,
+        pr_number: int,
+        result: AnalysisResult,
+        latest_commit_sha: Optional[str]
+    ) -> None:
+        """Post a single analysis result as a comment (errors are collected by the caller)"""
+        # Formatting also assigns the analysis result ID used for tracking
+        comment_body = self._format_comment(result)
+        
+        # Try to post as review comment
+        if latest_commit_sha:
+            comment = await self.async_client.post_review_comment(
+                owner=owner,
+                name=repo_name,
+                pr_number=pr_number,
+                body=comment_body,
+                commit_id=latest_commit_sha,
+                path=result.location.file_path,
+                line=result.location.line_start
+            )
+        else:
+            # Fallback to regular comment
+            comment = await self.async_client.post_comment(
+                owner=owner,
+                name=repo_name,
+                pr_number=pr_number,
+                comment=comment_body
+            )
+        
+        # Store comment ID -> analysis result ID mapping for feedback tracking
+        # (In production, store this in Redis or database)
+        if hasattr(comment, 'id'):
+            result.metadata["comment_id"] = comment.id
+
     
     def _format_comment(self, result) -> str:
         """Format analysis result as GitHub comment"""
-        emoji_map = {
-            "security": "🔒",
-            "bug": "🐛",
-            "performance": "⚡",
-            "architecture": "🏗️",
-            "test": "🧪",
-            "code_quality": "✨",
-            "style": "💅",
-            "business_logic": "💼",
-        }
-        
-        emoji = emoji_map.get(result.category.value, "💡")
-        priority_badge = f"**[{result.priority.value.upper()}]**" if result.priority != "info" else ""
+        emoji = self.CATEGORY_EMOJI.get(result.category.value, self.DEFAULT_EMOJI)
+        priority_badge = self.PRIORITY_BADGES.get(result.priority, "")
         
         # Generate analysis result ID for feedback tracking
-        analysis_result_id = result.metadata.get(
-            "analysis_result_id",
-            f"{result.category.value}_{result.location.file_path}_{result.location.line_start}_{hash(result.title)}"
-        )
+        analysis_result_id = ensure_result_id(result)
         
-        comment = f"""{emoji} **{result.title}** {priority_badge}
+        # Collect the pieces and join once instead of growing a string
+        parts = [f"""{emoji} **{result.title}** {priority_badge}
 
 {result.description}
 
 **Suggestion:** {result.suggestion}
 
-**Confidence:** {result.confidence:.0%}"""
+**Confidence:** {result.confidence:.0%}"""]
         
         if result.evidence:
-            comment += "\n\n**Related:**\n"
-            for evidence in result.evidence[:3]:
-                comment += f"- {evidence}\n"
+            parts.append("\n\n**Related:**\n")
+            parts.extend(f"- {evidence}\n" for evidence in result.evidence[:3])
         
         if result.code_snippet:
-            comment += f"\n```\n{result.code_snippet[:200]}\n```"
+            parts.append(f"\n```\n{result.code_snippet[:200]}\n```")
         
         # Add feedback collection footer
-        comment += f"""
+        parts.append(f"""
 
 ---
 💬 **Was this helpful?** React with 👍 or 👎 to help improve future reviews.
-<!-- analysis_result_id: {analysis_result_id} -->"""
+<!-- analysis_result_id: {analysis_result_id} -->""")
         
-        return comment
+        return "".join(parts)
 
@@ -19,19 +19,24 @@ class WebhookHandler:
         self.github_integration = GitHubIntegration(github_token)
         self.review_engine = review_engine or ReviewEngine()
         self.webhook_secret = webhook_secret
+        self._webhook_secret_bytes = webhook_secret.encode() if webhook_secret else None
     
     def verify_signature(self, payload: bytes, signature: str) -> bool:
-        """Verify webhook signature"""
+        """Verify webhook signature ("sha256=<hex digest>")"""
         if not self.webhook_secret:
             return True  # Skip verification if no secret configured
         
-        expected_signature = hmac.new(
-            self.webhook_secret.encode(),
-            payload,
-            hashlib.sha256
-        ).hexdigest()
+        algorithm, _, provided_hex = signature.partition("=")
+        if algorithm != "sha256":
+            return False
+        try:
+            provided = bytes.fromhex(provided_hex)
+        except ValueError:
+            return False
         
-        return hmac.compare_digest(f"sha256={expected_signature}", signature)
+        # Compare raw digests rather than formatted hex strings
+        expected = hmac.digest(self._webhook_secret_bytes, payload, hashlib.sha256)
+        return hmac.compare_digest(expected, provided)
     
     async def handle_pr_event(self, event: Dict) -> Dict:
         """
@@ -75,7 +80,8 @@ class WebhookHandler:
                 owner=owner,
                 repo_name=repo_name,
                 pr_number=pr_number,
-                results=results
+                results=results,
+                request=request
             )
             
             return {
@@ -5,13 +5,19 @@ from datetime import datetime, timedelta
 from ..models.feedback import Feedback, FeedbackStats, LearningPattern, FeedbackType
 from ..models.analysis import AnalysisResult, AnalysisCategory
 from ..utils.database import Neo4jConnection
-import redis
+from .feedback_collector import CATEGORY_ADJUSTMENTS_KEY, FeedbackCollector
+import redis.asyncio as redis
+import json
 import os
 
 
 class FeedbackAnalyzer:
     """Analyzes feedback to learn patterns and adjust confidence"""
     
+    # Seconds category adjustments are cached in Redis; they aggregate all
+    # feedback, so they change slowly but are costly to compute
+    CATEGORY_ADJUSTMENTS_TTL = 120
+    
     def __init__(
         self,
         neo4j_conn: Optional[Neo4jConnection] = None,
@@ -19,6 +25,8 @@ class FeedbackAnalyzer:
     ):
         self.neo4j = neo4j_conn or Neo4jConnection()
         self.redis = redis_client or self._init_redis()
+        # Reads feedback stats through the same Neo4j and Redis handles
+        self.collector = FeedbackCollector(neo4j_conn=self.neo4j, redis_client=self.redis)
         self.learning_patterns: Dict[str, LearningPattern] = {}
     
     def _init_redis(self):
@@ -119,12 +127,36 @@ class FeedbackAnalyzer:
         """
         if not feedback_stats:
             # Get feedback stats if not provided
-            from ..learning.feedback_collector import FeedbackCollector
-            collector = FeedbackCollector(neo4j_conn=self.neo4j, redis_client=self.redis)
-            feedback_stats = await collector.get_feedback_stats(
+            feedback_stats = await self.collector.get_feedback_stats(
                 result.metadata.get("analysis_result_id", "")
             )
         
+        return self._apply_feedback(result, feedback_stats)
+    
+    async def adjust_confidence_batch(self, results: List[AnalysisResult]) -> List[float]:
+        """
+        Adjust confidence scores for many results at once.
+        
+        Fetches the feedback stats for all results in a single round trip
+        instead of one per result.
+        
+        Args:
+            results: Analysis results to adjust
+            
+        Returns:
+            Adjusted confidence scores, in the same order as results
+        """
+        all_stats = await self.collector.get_feedback_stats_batch([
+            result.metadata.get("analysis_result_id", "") for result in results
+        ])
+        
+        return [
+            self._apply_feedback(result, feedback_stats)
+            for result, feedback_stats in zip(results, all_stats)
+        ]
+    
+    def _apply_feedback(self, result: AnalysisResult, feedback_stats: Optional[Dict]) -> float:
+        """Compute a result's confidence adjusted by its feedback stats"""
         if not feedback_stats or feedback_stats.get("total_feedback", 0) == 0:
             # No feedback, return original confidence
             return result.confidence
@@ -214,18 +246,30 @@ class FeedbackAnalyzer:
         self.learning_patterns[pattern_id] = pattern
         return pattern
     
-    async def get_category_adjustments(self) -> Dict[str, float]:
+    async def get_category_adjustments(self, days: int = 30) -> Dict[str, float]:
         """
         Get confidence adjustments by category based on feedback.
         
+        Args:
+            days: Number of days of feedback to consider
+            
         Returns:
             Dictionary mapping category to adjustment multiplier
         """
+        if self.redis:
+            try:
+                cached = await self.redis.hget(CATEGORY_ADJUSTMENTS_KEY, str(days))
+                if cached is not None:
+                    return json.loads(cached)
+            except Exception as e:
+                print(f"Error reading cached category adjustments: {e}")
+        
         adjustments = {}
         
         try:
             query = """
             MATCH (f:Feedback)-[:FEEDBACK_ON_RESULT]->(ar:AnalysisResult)
+            WHERE f.timestamp > datetime() - duration({days: $days})
             WITH ar.category AS category, 
                  sum(CASE WHEN f.type = 'positive' THEN 1 ELSE 0 END) AS positive,
                  sum(CASE WHEN f.type = 'negative' THEN 1 ELSE 0 END) AS negative,
@@ -236,7 +280,7 @@ class FeedbackAnalyzer:
                    toFloat(negative) / toFloat(total) AS negative_ratio
             """
             
-            results = self.neo4j.execute_query(query)
+            results = self.neo4j.execute_query(query, {"days": days})
             
             for result in results:
                 category = result["category"]
@@ -248,6 +292,15 @@ class FeedbackAnalyzer:
                 # High negative ratio = decrease confidence
                 multiplier = 1.0 + (positive_ratio - negative_ratio) * 0.3
                 adjustments[category] = max(0.7, min(1.3, multiplier))
+            
+            if self.redis:
+                # One hash field per window, so new feedback drops them all at once.
+                # The expiry is only set when the hash is created: refreshing one
+                # window must not extend the lifetime of the others
+                pipeline = self.redis.pipeline(transaction=True)
+                pipeline.hset(CATEGORY_ADJUSTMENTS_KEY, str(days), json.dumps(adjustments))
+                pipeline.expire(CATEGORY_ADJUSTMENTS_KEY, self.CATEGORY_ADJUSTMENTS_TTL, nx=True)
+                await pipeline.execute()
         except Exception as e:
             print(f"Error getting category adjustments: {e}")
         
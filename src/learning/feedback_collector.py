@@ -4,14 +4,29 @@ from typing import List, Optional, Dict
 from datetime import datetime
 from ..models.feedback import Feedback, FeedbackType, FeedbackSource
 from ..utils.database import Neo4jConnection
-import redis
+import redis.asyncio as redis
 import json
 import os
+import re
+
+
+# Words classifying a reply to a review comment, checked in this order. Whole
+# words only, so "incorrect" isn't read as "correct" or "note" as "not"
+_POSITIVE_REPLY_RE = re.compile(r"\b(?:thanks|good|helpful|correct|agree)\b")
+_NEGATIVE_REPLY_RE = re.compile(r"\b(?:wrong|incorrect|not|disagree|false)\b")
+_CORRECTION_REPLY_RE = re.compile(r"\b(?:actually|should be|better|instead)\b")
+
+# Redis key caching FeedbackAnalyzer.get_category_adjustments; new feedback
+# drops it so the next read recomputes
+CATEGORY_ADJUSTMENTS_KEY = "feedback:category_adjustments"
 
 
 class FeedbackCollector:
     """Collects feedback from various sources"""
     
+    # Seconds feedback and its stats are kept in Redis
+    FEEDBACK_TTL = 86400 * 30
+    
     def __init__(
         self,
         neo4j_conn: Optional[Neo4jConnection] = None,
@@ -44,75 +59,107 @@ class FeedbackCollector:
         Returns:
             True if stored successfully
         """
+        return await self.collect_feedback_batch([feedback])
+    
+    async def collect_feedback_batch(
+        self,
+        feedbacks: List[Feedback]
+    ) -> bool:
+        """
+        Collect and store many feedback events at once.
+        
+        Writes them with one Neo4j query and one Redis round trip, instead
+        of one of each per event (e.g. for replays or reaction bursts).
+        
+        Args:
+            feedbacks: Feedback objects to store
+            
+        Returns:
+            True if stored successfully
+        """
+        if not feedbacks:
+            return True
+        
         try:
             # Store in Neo4j
-            await self._store_in_neo4j(feedback)
+            await self._store_in_neo4j(feedbacks)
             
             # Store in Redis for quick access
-            await self._store_in_redis(feedback)
+            await self._store_in_redis(feedbacks)
             
             return True
         except Exception as e:
             print(f"Error collecting feedback: {e}")
             return False
     
-    async def _store_in_neo4j(self, feedback: Feedback):
+    async def _store_in_neo4j(self, feedbacks: List[Feedback]):
         """Store feedback in Neo4j"""
         try:
-            # Create feedback node
+            # Create feedback nodes, one row per feedback. Timestamps are stored
+            # as temporal values so time-window filters can use their index
             query = """
-            MERGE (f:Feedback {id: $id})
-            SET f.type = $type,
-                f.source = $source,
-                f.reviewer = $reviewer,
-                f.timestamp = $timestamp,
-                f.category = $category,
-                f.file_path = $file_path,
-                f.line_number = $line_number,
-                f.comment = $comment,
-                f.correction = $correction
-            WITH f
-            MATCH (pr:PR {id: $pr_id})
+            UNWIND $rows AS row
+            MERGE (f:Feedback {id: row.id})
+            SET f.type = row.type,
+                f.source = row.source,
+                f.reviewer = row.reviewer,
+                f.timestamp = datetime(row.timestamp),
+                f.category = row.category,
+                f.file_path = row.file_path,
+                f.line_number = row.line_number,
+                f.comment = row.comment,
+                f.correction = row.correction
+            WITH f, row
+            MATCH (pr:PR {id: row.pr_id})
             MERGE (f)-[:FEEDBACK_ON]->(pr)
-            MERGE (ar:AnalysisResult {id: $analysis_result_id})
+            MERGE (ar:AnalysisResult {id: row.analysis_result_id})
             MERGE (f)-[:FEEDBACK_ON_RESULT]->(ar)
-            RETURN f
             """
             
-            self.neo4j.execute_query(query, {
-                "id": feedback.id or f"{feedback.pr_id}_{feedback.analysis_result_id}_{datetime.now().timestamp()}",
-                "type": feedback.feedback_type.value,
-                "source": feedback.source.value,
-                "reviewer": feedback.reviewer,
-                "timestamp": feedback.timestamp.isoformat(),
-                "category": feedback.category,
-                "file_path": feedback.file_path,
-                "line_number": feedback.line_number,
-                "comment": feedback.comment,
-                "correction": feedback.correction,
-                "pr_id": feedback.pr_id,
-                "analysis_result_id": feedback.analysis_result_id
-            })
+            self.neo4j.execute_query(query, {"rows": [
+                {
+                    "id": feedback.id or f"{feedback.pr_id}_{feedback.analysis_result_id}_{datetime.now().timestamp()}",
+                    "type": feedback.feedback_type.value,
+                    "source": feedback.source.value,
+                    "reviewer": feedback.reviewer,
+                    "timestamp": feedback.timestamp.isoformat(),
+                    "category": feedback.category,
+                    "file_path": feedback.file_path,
+                    "line_number": feedback.line_number,
+                    "comment": feedback.comment,
+                    "correction": feedback.correction,
+                    "pr_id": feedback.pr_id,
+                    "analysis_result_id": feedback.analysis_result_id
+                }
+                for feedback in feedbacks
+            ]})
         except Exception as e:
             print(f"Error storing feedback in Neo4j: {e}")
     
-    async def _store_in_redis(self, feedback: Feedback):
+    async def _store_in_redis(self, feedbacks: List[Feedback]):
         """Store feedback in Redis for quick access"""
         if not self.redis:
             return
         
         try:
-            # Store feedback by analysis result ID
-            key = f"feedback:{feedback.analysis_result_id}"
-            feedback_data = feedback.model_dump_json()
-            self.redis.lpush(key, feedback_data)
-            self.redis.expire(key, 86400 * 30)  # Expire after 30 days
+            # Send the list and stats updates in one round trip
+            pipeline = self.redis.pipeline(transaction=True)
+            
+            for feedback in feedbacks:
+                # Store feedback by analysis result ID
+                key = f"feedback:{feedback.analysis_result_id}"
+                pipeline.lpush(key, feedback.model_dump_json())
+                pipeline.expire(key, self.FEEDBACK_TTL)
+                
+                # Store stats
+                stats_key = f"feedback:stats:{feedback.analysis_result_id}"
+                pipeline.hincrby(stats_key, f"{feedback.feedback_type.value}_count", 1)
+                pipeline.hincrby(stats_key, "total_count", 1)
+                pipeline.expire(stats_key, self.FEEDBACK_TTL)
+            
+            pipeline.delete(CATEGORY_ADJUSTMENTS_KEY)
             
-            # Store stats
-            stats_key = f"feedback:stats:{feedback.analysis_result_id}"
-            self.redis.hincrby(stats_key, f"{feedback.feedback_type.value}_count", 1)
-            self.redis.hincrby(stats_key, "total_count", 1)
-            self.redis.expire(stats_key, 86400 * 30)
+            await pipeline.execute()
         except Exception as e:
             print(f"Error storing feedback in Redis: {e}")
     
@@ -176,18 +223,18 @@ class FeedbackCollector:
         """Collect feedback from comment reply"""
         # Analyze reply text to determine feedback type
         reply_lower = reply_text.lower()
+        correction = None
         
-        if any(word in reply_lower for word in ["thanks", "good", "helpful", "correct", "agree"]):
+        if _POSITIVE_REPLY_RE.search(reply_lower):
             feedback_type = FeedbackType.POSITIVE
-        elif any(word in reply_lower for word in ["wrong", "incorrect", "not", "disagree", "false"]):
+        elif _NEGATIVE_REPLY_RE.search(reply_lower):
             feedback_type = FeedbackType.NEGATIVE
-        elif any(word in reply_lower for word in ["actually", "should be", "better", "instead"]):
+        elif _CORRECTION_REPLY_RE.search(reply_lower):
             feedback_type = FeedbackType.CORRECTION
             # Try to extract correction
             correction = reply_text
         else:
             feedback_type = FeedbackType.NEUTRAL
-            correction = None
         
         feedback = Feedback(
             analysis_result_id=analysis_result_id,
@@ -248,24 +295,40 @@ class FeedbackCollector:
         
         try:
             stats_key = f"feedback:stats:{analysis_result_id}"
-            stats = self.redis.hgetall(stats_key)
-            
-            total = int(stats.get("total_count", 0))
-            positive = int(stats.get("positive_count", 0))
-            negative = int(stats.get("negative_count", 0))
-            neutral = int(stats.get("neutral_count", 0))
-            correction = int(stats.get("correction_count", 0))
-            
-            return {
-                "total_feedback": total,
-                "positive_count": positive,
-                "negative_count": negative,
-                "neutral_count": neutral,
-                "correction_count": correction,
-                "positive_ratio": positive / total if total > 0 else 0.0
-            }
+            return self._parse_stats(await self.redis.hgetall(stats_key))
         except Exception as e:
             print(f"Error getting feedback stats: {e}")
             return {}
+    
+    async def get_feedback_stats_batch(self, analysis_result_ids: List[str]) -> List[Dict]:
+        """Get feedback statistics for many analysis results in one Redis round trip"""
+        if not self.redis or not analysis_result_ids:
+            return [{} for _ in analysis_result_ids]
+        
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for analysis_result_id in analysis_result_ids:
+                pipeline.hgetall(f"feedback:stats:{analysis_result_id}")
+            return [self._parse_stats(stats) for stats in await pipeline.execute()]
+        except Exception as e:
+            print(f"Error getting feedback stats: {e}")
+            return [{} for _ in analysis_result_ids]
+    
+    def _parse_stats(self, stats: Dict) -> Dict:
+        """Convert a feedback stats hash into counts and a positive ratio"""
+        total = int(stats.get("total_count", 0))
+        positive = int(stats.get("positive_count", 0))
+        negative = int(stats.get("negative_count", 0))
+        neutral = int(stats.get("neutral_count", 0))
+        correction = int(stats.get("correction_count", 0))
+        
+        return {
+            "total_feedback": total,
+            "positive_count": positive,
+            "negative_count": negative,
+            "neutral_count": neutral,
+            "correction_count": correction,
+            "positive_ratio": positive / total if total > 0 else 0.0
+        }
 
 
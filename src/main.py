@@ -6,7 +6,7 @@ from fastapi import FastAPI, Request, HTTPException, Header
 from fastapi.responses import JSONResponse
 from pydantic_settings import BaseSettings
 from .integrations.webhook import WebhookHandler
-from .integrations.github import GitHubIntegration
+from .context.github_client import close_http_client
 from .engine.review_engine import ReviewEngine
 from .utils.database import Neo4jConnection, QdrantConnection
 from .utils.embeddings import CodeEmbedder
@@ -99,6 +99,12 @@ webhook_handler = WebhookHandler(
 )
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Release pooled connections"""
+    close_http_client()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -174,7 +180,8 @@ async def review_pr(
         pr_number: Pull request number
     """
     try:
-        github_integration = GitHubIntegration(settings.github_token)
+        # Reuse the webhook handler's client and its open connections
+        github_integration = webhook_handler.github_integration
         
         # Create review request
         request = await github_integration.create_review_request(
@@ -191,7 +198,8 @@ async def review_pr(
             owner=owner,
             repo_name=repo,
             pr_number=pr_number,
-            results=results
+            results=results,
+            request=request
         )
         
         return {
@@ -3,12 +3,14 @@
 from .code_parser import CodeParser
 from .embeddings import CodeEmbedder
 from .database import Neo4jConnection, QdrantConnection
+from .result_ids import ensure_result_id
 
 __all__ = [
     "CodeParser",
     "CodeEmbedder",
     "Neo4jConnection",
     "QdrantConnection",
+    "ensure_result_id",
 ]
 
 
@@ -4,12 +4,27 @@ from typing import Optional
 import os
 from neo4j import GraphDatabase
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
+from qdrant_client.models import Distance, FieldCondition, Filter, MatchValue, VectorParams
 
 
 class Neo4jConnection:
     """Neo4j graph database connection manager"""
     
+    # Pooled driver connections; concurrent reviews share them
+    MAX_POOL_SIZE = 20
+    
+    # Schema created on connect (idempotent DDL only): uniqueness constraints,
+    # which also index the ids MERGE looks nodes up by, and indexes for the
+    # feedback queries' filters and grouping. Data migrations live in
+    # src/utils/migrations.py and are run explicitly
+    SCHEMA_STATEMENTS = (
+        "CREATE CONSTRAINT feedback_id IF NOT EXISTS FOR (f:Feedback) REQUIRE f.id IS UNIQUE",
+        "CREATE CONSTRAINT pr_id IF NOT EXISTS FOR (pr:PR) REQUIRE pr.id IS UNIQUE",
+        "CREATE CONSTRAINT analysis_result_id IF NOT EXISTS FOR (ar:AnalysisResult) REQUIRE ar.id IS UNIQUE",
+        "CREATE INDEX feedback_timestamp IF NOT EXISTS FOR (f:Feedback) ON (f.timestamp)",
+        "CREATE INDEX analysis_result_category IF NOT EXISTS FOR (ar:AnalysisResult) ON (ar.category)",
+    )
+    
     def __init__(
         self,
         uri: Optional[str] = None,
@@ -22,21 +37,43 @@ class Neo4jConnection:
         self.driver = None
     
     def connect(self):
-        """Establish connection to Neo4j"""
+        """Establish connection to Neo4j (a no-op if already connected)"""
+        if self.driver:
+            return True
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+            self.driver = GraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                max_connection_pool_size=self.MAX_POOL_SIZE
+            )
             # Verify connection
             with self.driver.session() as session:
                 session.run("RETURN 1")
+            self._ensure_schema()
             return True
         except Exception as e:
             print(f"Failed to connect to Neo4j: {e}")
+            # Don't leave a half-open driver that later calls would mistake for a connection
+            if self.driver:
+                self.driver.close()
+                self.driver = None
             return False
     
+    def _ensure_schema(self):
+        """Create constraints and indexes if they don't exist yet"""
+        with self.driver.session() as session:
+            for statement in self.SCHEMA_STATEMENTS:
+                # One failure (e.g. existing duplicate ids) shouldn't skip the rest
+                try:
+                    session.run(statement).consume()
+                except Exception as e:
+                    print(f"Warning: Failed to create Neo4j schema ({statement}): {e}")
+    
     def close(self):
         """Close Neo4j connection"""
         if self.driver:
             self.driver.close()
+            self.driver = None
     
     def execute_query(self, query: str, parameters: Optional[dict] = None):
         """Execute a Cypher query"""
@@ -133,7 +170,9 @@ class QdrantConnection:
         self.vector_size = 768  # CodeBERT embedding size
     
     def connect(self):
-        """Establish connection to Qdrant"""
+        """Establish connection to Qdrant (a no-op if already connected)"""
+        if self.client:
+            return True
         try:
             self.client = QdrantClient(host=self.host, port=self.port)
             # Create collection if it doesn't exist
@@ -193,16 +232,30 @@ class QdrantConnection:
         self,
         query_embedding: list,
         limit: int = 10,
-        score_threshold: float = 0.7
+        score_threshold: float = 0.7,
+        payload_filter: Optional[dict] = None
     ):
-        """Search for similar PRs using vector similarity"""
+        """
+        Search for similar PRs using vector similarity.
+        
+        payload_filter maps payload keys to required values (e.g. repo_owner),
+        and is applied by Qdrant during the search rather than afterwards.
+        """
         if not self.client:
             if not self.connect():
                 return []
         
+        query_filter = None
+        if payload_filter:
+            query_filter = Filter(must=[
+                FieldCondition(key=key, match=MatchValue(value=value))
+                for key, value in payload_filter.items()
+            ])
+        
         results = self.client.search(
             collection_name=self.collection_name,
             query_vector=query_embedding,
+            query_filter=query_filter,
             limit=limit,
             score_threshold=score_threshold
         )
@@ -225,8 +278,6 @@ class QdrantConnection:
                 return None
         
         try:
-            from qdrant_client.models import Filter, FieldCondition, MatchValue
-            
             # Search with filter
             results = self.client.scroll(
                 collection_name=self.collection_name,
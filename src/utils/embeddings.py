@@ -1,6 +1,6 @@
 """Code embedding utilities for similarity search"""
 
-from typing import List, Optional
+from typing import List, Optional, Sequence
 import numpy as np
 import os
 
@@ -77,7 +77,7 @@ class CodeEmbedder:
         # Fallback to placeholder
         return np.array([self.embed_code(code) for code in code_snippets])
     
-    def embed_pr_content(self, title: str, description: str, file_paths: List[str], code_snippets: List[str]) -> np.ndarray:
+    def embed_pr_content(self, title: str, description: str, file_paths: Sequence[str], code_snippets: Sequence[str]) -> np.ndarray:
         """
         Generate embedding for entire PR content.
         Combines title, description, file paths, and code snippets.
@@ -92,9 +92,11 @@ class CodeEmbedder:
             content_parts.append(f"Files: {', '.join(file_paths[:20])}")  # Limit to 20 files
         
         # Add code snippets (limit to prevent too long input)
-        for snippet in code_snippets[:5]:  # Limit to 5 snippets
-            if snippet:
-                content_parts.append(f"Code: {snippet[:200]}")  # Limit snippet length
+        content_parts.extend(
+            f"Code: {snippet[:200]}"  # Limit snippet length
+            for snippet in code_snippets[:5]  # Limit to 5 snippets
+            if snippet
+        )
         
         combined_text = "\n".join(content_parts)
         return self.embed_code(combined_text)
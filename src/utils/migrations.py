@@ -0,0 +1,46 @@
+"""
+One-off data migrations for the Neo4j store.
+
+Run explicitly (not on connect), e.g. after upgrading:
+
+    python -m src.utils.migrations
+"""
+
+from typing import Optional
+from .database import Neo4jConnection
+
+
+# Feedback stored before timestamps became Neo4j datetimes kept them as ISO
+# strings, which time-window queries can't compare. Only string values match
+# (a datetime compared with a string is null), so rerunning it is a no-op.
+FEEDBACK_TIMESTAMPS_QUERY = """
+MATCH (f:Feedback) WHERE f.timestamp >= ''
+CALL { WITH f SET f.timestamp = datetime(f.timestamp) } IN TRANSACTIONS OF 10000 ROWS
+"""
+
+
+def migrate_feedback_timestamps(conn: Neo4jConnection) -> int:
+    """Convert string feedback timestamps to datetimes; returns how many were converted"""
+    if not conn.connect():
+        raise ConnectionError("Failed to connect to Neo4j")
+    
+    # CALL ... IN TRANSACTIONS needs an auto-commit transaction, i.e. session.run
+    with conn.driver.session() as session:
+        summary = session.run(FEEDBACK_TIMESTAMPS_QUERY).consume()
+    return summary.counters.properties_set
+
+
+def main(conn: Optional[Neo4jConnection] = None):
+    """Run all migrations against the configured Neo4j database"""
+    conn = conn or Neo4jConnection()
+    try:
+        converted = migrate_feedback_timestamps(conn)
+        print(f"Converted {converted} feedback timestamps to datetimes")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
+
+
@@ -0,0 +1,28 @@
+"""Identifiers linking analysis results to their feedback"""
+
+import hashlib
+from ..models.analysis import AnalysisResult
+
+
+def ensure_result_id(result: AnalysisResult) -> str:
+    """
+    Return the result's analysis_result_id, assigning it on first use.
+    
+    The ID is stored in result.metadata, so it is computed once per result
+    however many places (learning, comment posting) need it. It must be the
+    same in every process, since feedback arrives after a restart or on
+    another worker, so the title is hashed with blake2b rather than hash(),
+    which is randomized per interpreter.
+    """
+    analysis_result_id = result.metadata.get("analysis_result_id")
+    if analysis_result_id is None:
+        title_hash = hashlib.blake2b(result.title.encode(), digest_size=8).hexdigest()
+        analysis_result_id = (
+            f"{result.category.value}_{result.location.file_path}_"
+            f"{result.location.line_start}_{title_hash}"
+        )
+        result.metadata["analysis_result_id"] = analysis_result_id
+    return analysis_result_id
+
+
+
@@ -3,7 +3,8 @@
 import pytest
 from datetime import datetime
 from src.models.review import CodeReviewRequest, Repository, FileDiff
-from src.analyzers import PatternMatcher, SecurityScanner
+from src.analyzers import PatternMatcher, SecurityScanner, ArchitectureChecker, TestGapAnalyzer
+from src.analyzers.base import shared_diff_cache
 
 
 @pytest.fixture
@@ -79,4 +80,145 @@ async def test_confidence_filtering(sample_review_request):
     assert all(r.confidence >= 0.5 for r in filtered_results)
 
 
+@pytest.mark.asyncio
+async def test_architecture_checker_reports_circular_import_once(sample_review_request):
+    """Test that a circular import between two files is reported once, resolving paths to modules"""
+    sample_review_request.diff = [
+        FileDiff(
+            file_path="pkg/alpha.py",
+            additions=1,
+            deletions=0,
+            changes=1,
+            diff="+import pkg.beta\n",
+            status="modified",
+            language="python"
+        ),
+        FileDiff(
+            file_path="src/pkg/beta.py",
+            additions=1,
+            deletions=0,
+            changes=1,
+            diff="+from pkg.alpha import thing\n",
+            status="modified",
+            language="python"
+        ),
+    ]
+    
+    checker = ArchitectureChecker()
+    results = await checker.analyze(sample_review_request)
+    
+    circular = [r for r in results if r.title == "Potential circular dependency"]
+    assert len(circular) == 1
+    assert circular[0].metadata["circular_with"] == "src/pkg/beta.py"
+
+
+@pytest.mark.asyncio
+async def test_pattern_matcher_reports_added_line_numbers(sample_review_request):
+    """Test that matches map back to their added lines and never span lines"""
+    sample_review_request.diff[0].diff = """@@ -1,4 +1,6 @@
+ def handler():
+-    old_call()
++    print("first")
++    value = (1 +
+     return value
++    print("second")
++    print(
++        "third")
+"""
+    
+    matcher = PatternMatcher()
+    results = await matcher.analyze(sample_review_request)
+    
+    prints = [r for r in results if r.metadata["pattern_name"] == "print_debug"]
+    assert sorted(r.location.line_start for r in prints) == [2, 5]
+
+
+@pytest.mark.asyncio
+async def test_generated_files_are_not_scanned(sample_review_request):
+    """Test that lockfiles and other build artifacts are skipped"""
+    sample_review_request.diff[0].file_path = "poetry.lock"
+    
+    scanner = SecurityScanner()
+    assert await scanner.analyze(sample_review_request) == []
+    
+    matcher = PatternMatcher()
+    assert await matcher.analyze(sample_review_request) == []
+
+
+@pytest.mark.asyncio
+async def test_pattern_matcher_skips_overlong_lines(sample_review_request):
+    """Test that huge (minified) added lines are not scanned"""
+    sample_review_request.diff[0].diff = "+" + "x" * PatternMatcher.MAX_LINE_LENGTH + ' print("hidden")\n+print("shown")\n'
+    
+    matcher = PatternMatcher()
+    results = await matcher.analyze(sample_review_request)
+    
+    prints = [r for r in results if r.metadata["pattern_name"] == "print_debug"]
+    assert [r.location.line_start for r in prints] == [2]
+
+
+@pytest.mark.asyncio
+async def test_test_gap_analyzer_matches_tests_by_module_name(sample_review_request):
+    """Test that changed modules are only flagged when no matching test file changed"""
+    def file_diff(file_path):
+        return FileDiff(
+            file_path=file_path,
+            additions=20,
+            deletions=0,
+            changes=20,
+            diff="+assert True\n",
+            status="modified",
+            language="python"
+        )
+    
+    sample_review_request.diff = [
+        file_diff("src/billing/invoice.py"),
+        file_diff("src/billing/refund.py"),
+        file_diff("tests/test_invoice.py"),
+    ]
+    
+    analyzer = TestGapAnalyzer()
+    results = await analyzer.analyze(sample_review_request)
+    
+    missing = [r for r in results if r.title == "No corresponding test file detected"]
+    assert [r.location.file_path for r in missing] == ["src/billing/refund.py"]
+
+
+@pytest.mark.asyncio
+async def test_architecture_checker_hyperscan_stops_early(sample_review_request):
+    """Test that a huge diff containing every keyword group is still analyzed with hyperscan"""
+    pytest.importorskip("hyperscan")
+    
+    keywords = "\n".join(
+        "+" + keywords[0]
+        for keywords in ArchitectureChecker.DIFF_KEYWORDS.values()
+    )
+    sample_review_request.diff[0].diff = keywords + "\n+" + "x" * ArchitectureChecker.HYPERSCAN_MIN_SIZE + "\n"
+    sample_review_request.diff[0].changes = 100
+    
+    checker = ArchitectureChecker()
+    assert checker._diff_hyperscan is not None
+    results = await checker.analyze(sample_review_request)
+    
+    assert any(r.title == "Singleton pattern detected" for r in results)
+
+
+def test_lowercased_diffs_are_shared_within_a_review(sample_review_request):
+    """Test that analyzers share one lowercased diff per review and keep none afterwards"""
+    file_diff = sample_review_request.diff[0]
+    scanner = SecurityScanner()
+    matcher = PatternMatcher()
+    
+    with shared_diff_cache():
+        lowered = scanner._diff_lower(file_diff)
+        assert matcher._diff_lower(file_diff) is lowered
+        assert lowered == file_diff.diff.lower()
+        
+        file_diff.diff = "+NEW"
+        assert matcher._diff_lower(file_diff) == "+new"
+    
+    # Outside a review nothing is cached
+    assert scanner._diff_lower(file_diff) is not scanner._diff_lower(file_diff)
+
+
 
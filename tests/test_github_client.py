@@ -0,0 +1,65 @@
+"""Tests for the GitHub API client"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.context.github_client import GitHubClient
+
+
+class CountingGithub:
+    """Stands in for PyGithub, counting (slow) repository and PR fetches"""
+    
+    def __init__(self):
+        self.calls = {"get_repo": 0, "get_pull": 0}
+        self._lock = threading.Lock()
+    
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] += 1
+        time.sleep(0.05)
+    
+    def get_repo(self, full_name):
+        self._count("get_repo")
+        return self
+    
+    def get_pull(self, number):
+        self._count("get_pull")
+        return {"number": number}
+
+
+def test_concurrent_lookups_fetch_once():
+    """Test that concurrent calls for the same repository and PR share one fetch"""
+    client = GitHubClient("token")
+    client.github = CountingGithub()
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        repos = [executor.submit(client._get_repo, "owner", "repo") for _ in range(4)]
+        prs = [executor.submit(client._get_pr, "owner", "repo", 1) for _ in range(4)]
+        results = [future.result() for future in repos + prs]
+    
+    assert client.github.calls == {"get_repo": 1, "get_pull": 1}
+    assert results[-1] == {"number": 1}
+
+
+def test_failed_fetch_is_not_cached():
+    """Test that a failed fetch is raised to every waiter and retried afterwards"""
+    client = GitHubClient("token")
+    attempts = []
+    
+    def fetch():
+        attempts.append(1)
+        time.sleep(0.05)
+        if len(attempts) == 1:
+            raise RuntimeError("rate limited")
+        return "value"
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(client._cached, ("key",), fetch) for _ in range(4)]
+        errors = [future.exception() for future in futures]
+    
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert client._cached(("key",), fetch) == "value"
+    assert len(attempts) == 2
+
+
+
@@ -101,6 +101,43 @@ def test_neo4j_connection_initialization():
     # Don't actually connect in tests unless databases are available
 
 
+def test_neo4j_connect_reuses_open_driver(monkeypatch):
+    """Test that connecting an already connected Neo4jConnection keeps its driver"""
+    created = []
+    
+    class FakeDriver:
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+        
+        def session(self):
+            return FakeSession()
+        
+        def close(self):
+            pass
+    
+    class FakeSession:
+        def __enter__(self):
+            return self
+        
+        def __exit__(self, *exc_info):
+            return False
+        
+        def run(self, query, parameters=None):
+            return FakeResult()
+    
+    class FakeResult:
+        def consume(self):
+            pass
+    
+    monkeypatch.setattr("src.utils.database.GraphDatabase.driver", FakeDriver)
+    conn = Neo4jConnection()
+    assert conn.connect()
+    driver = conn.driver
+    assert conn.connect()
+    assert conn.driver is driver
+    assert len(created) == 1
+
+
 def test_qdrant_connection_initialization():
     """Test Qdrant connection can be initialized"""
     conn = QdrantConnection()
@@ -0,0 +1,54 @@
+"""Tests for webhook signature verification"""
+
+import hashlib
+import hmac
+import pytest
+from src.integrations.webhook import WebhookHandler
+
+
+SECRET = "webhook-secret"
+PAYLOAD = b'{"action": "opened"}'
+
+
+@pytest.fixture
+def handler():
+    """Create a webhook handler with a secret configured"""
+    return WebhookHandler(github_token="token", webhook_secret=SECRET)
+
+
+def sign(payload: bytes, secret: str = SECRET) -> str:
+    """Hex HMAC-SHA256 of payload, as GitHub computes it"""
+    return hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
+
+
+def test_valid_signature_is_accepted(handler):
+    """Test that a correct sha256 signature verifies"""
+    assert handler.verify_signature(PAYLOAD, f"sha256={sign(PAYLOAD)}")
+
+
+def test_wrong_digest_is_rejected(handler):
+    """Test that a signature made with another secret or payload is rejected"""
+    assert not handler.verify_signature(PAYLOAD, f"sha256={sign(PAYLOAD, 'other-secret')}")
+    assert not handler.verify_signature(PAYLOAD + b" ", f"sha256={sign(PAYLOAD)}")
+
+
+def test_sha1_signature_is_rejected(handler):
+    """Test that only sha256 signatures are accepted"""
+    digest = hmac.new(SECRET.encode(), PAYLOAD, hashlib.sha1).hexdigest()
+    assert not handler.verify_signature(PAYLOAD, f"sha1={digest}")
+    assert not handler.verify_signature(PAYLOAD, f"sha1={sign(PAYLOAD)}")
+
+
+def test_malformed_hex_is_rejected(handler):
+    """Test that a digest that isn't valid hex is rejected without raising"""
+    assert not handler.verify_signature(PAYLOAD, "sha256=not-hex")
+    assert not handler.verify_signature(PAYLOAD, f"sha256={sign(PAYLOAD)[:-1]}")
+
+
+def test_signature_without_separator_is_rejected(handler):
+    """Test that a header missing the '=' separator is rejected"""
+    assert not handler.verify_signature(PAYLOAD, sign(PAYLOAD))
+    assert not handler.verify_signature(PAYLOAD, f"sha256{sign(PAYLOAD)}")
+
+
+